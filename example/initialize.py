@@ -2,13 +2,17 @@
 
 """An example script to initialize audio lists and speaker configurations.
 
-Usage: initialize.py [-h] [-1] [-2] [-3] SOURCE TARGET SAMPLING_RATE
+Usage: initialize.py [-h] [-1] [-2] [-3] [--cache_dir CACHE_DIR]
+                     SOURCE TARGET SAMPLING_RATE
 
 Options:
     -h, --help     Show the help
     -1, --step1    Execute step1 (Generation of initial list files)
     -2, --step2    Execute step2 (Generation of configure files)
     -3, --step3    Execute step3 (Estimation of F0 ranges)
+    --cache_dir CACHE_DIR
+                   Directory of cache of acoustic features analyzed
+                   for the estimation of F0 ranges
     SOURCE         The name of speaker
                    whose voice you would like to convert from
     TARGET         The name of speaker whose voice you would like to convert to
@@ -174,9 +178,11 @@ if __name__ == "__main__":
     if execute_steps[3]:
         print("### 3. create figures to define parameters ###")
         # get F0 range in each speaker
+        cache_option = [] if args["--cache_dir"] is None \
+            else ["--cache_dir", args["--cache_dir"]]
         for part, speaker in LABELS.items():
             initialize_speaker.main(
-                speaker, str(LIST_FILES[part]["train"]),
+                *cache_option, speaker, str(LIST_FILES[part]["train"]),
                 str(WAV_DIR), str(CONF_DIR / "figure"))
         print("# Please modify f0 range and power threshold"
               " in speaker-dependent YAML files #")
@@ -2,7 +2,9 @@
 
 """An example script to run sprocket.
 
-Usage: run_sprocket.py [-h] [-1] [-2] [-3] [-4] [-5] SOURCE TARGET
+Usage: run_sprocket.py [-h] [-1] [-2] [-3] [-4] [-5] [-j JOBS]
+                       [--cache_dir CACHE_DIR] [--store] [--float32]
+                       SOURCE TARGET
 
 Options:
     -h, --help   Show the help
@@ -11,6 +13,16 @@ Options:
     -3, --step3  Execute step3 (Estimation of time warping function and jnt)
     -4, --step4  Execute step4 (Training of GMM)
     -5, --step5  Execute step5 (Conversion based on the trained models)
+    -j JOBS, --jobs JOBS
+                 Number of processes for extraction of acoustic features
+                 [default: 1]
+    --cache_dir CACHE_DIR
+                 Directory of cache of acoustic features shared by steps
+                 and runs
+    --store      Extract acoustic features into the feature store shared by
+                 speaker pairs (data/speaker) instead of the pair directory
+    --float32    Save acoustic features and joint feature vectors in float32,
+                 and train and convert with GMM in float32
     SOURCE         The name of speaker
                    whose voice you would like to convert from
     TARGET         The name of speaker whose voice you would like to convert to
@@ -80,6 +92,7 @@ CONF_DIR = EXAMPLE_ROOT_DIR / "conf"
 DATA_DIR = EXAMPLE_ROOT_DIR / "data"
 LIST_DIR = EXAMPLE_ROOT_DIR / "list"
 WAV_DIR = DATA_DIR / "wav"
+STORE_DIR = DATA_DIR / "speaker"
 
 if __name__ == "__main__":
     args = docopt.docopt(__doc__)  # pylint: disable=invalid-name
@@ -117,11 +130,20 @@ if __name__ == "__main__":
 
     os.makedirs(str(PAIR_DIR), exist_ok=True)
 
+    cache_option = [] if args["--cache_dir"] is None \
+        else ["--cache_dir", args["--cache_dir"]]
+    store_option = ["--store_dir", str(STORE_DIR)] if args["--store"] else []
+    float32_option = ["--float32"] if args["--float32"] else []
+
     if execute_steps[1]:
         print("### 1. Extract acoustic features ###")
         # Extract acoustic features consisting of F0, spc, ap, mcep, npow
         for speaker_part, speaker_label in LABELS.items():
             extract_features.main(
+                "--jobs", args["--jobs"],
+                *store_option,
+                *cache_option,
+                *float32_option,
                 speaker_label, str(SPEAKER_CONF_FILES[speaker_part]),
                 str(LIST_FILES[speaker_part]['train']),
                 str(WAV_DIR), str(PAIR_DIR))
@@ -137,6 +159,7 @@ if __name__ == "__main__":
     if execute_steps[3]:
         print("### 3. Estimate time warping function and jnt ###")
         estimate_twf_and_jnt.main(
+            *float32_option,
             str(SPEAKER_CONF_FILES["source"]),
             str(SPEAKER_CONF_FILES["target"]),
             str(PAIR_CONF_FILE),
@@ -148,6 +171,7 @@ if __name__ == "__main__":
         print("### 4. Train GMM and converted GV ###")
         # estimate GMM parameter using the joint feature vector
         train_GMM.main(
+            *float32_option,
             str(LIST_FILES["source"]["train"]),
             str(PAIR_CONF_FILE),
             str(PAIR_DIR))
@@ -157,6 +181,8 @@ if __name__ == "__main__":
         EVAL_LIST_FILE = LIST_FILES["source"]["eval"]
         # convertsion based on the trained GMM
         convert.main(
+            *cache_option,
+            *float32_option,
             LABELS["source"], LABELS["target"],
             str(SPEAKER_CONF_FILES["source"]),
             str(PAIR_CONF_FILE),
@@ -164,6 +190,8 @@ if __name__ == "__main__":
             str(WAV_DIR),
             str(PAIR_DIR))
         convert.main(
+            *cache_option,
+            *float32_option,
             "-gmmmode", "diff",
             LABELS["source"], LABELS["target"],
             str(SPEAKER_CONF_FILES["source"]),
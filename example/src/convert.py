@@ -15,10 +15,10 @@ from scipy.io import wavfile
 import joblib
 
 from sprocket.model import GV, F0statistics, GMMConvertor
-from sprocket.speech import FeatureExtractor, Synthesizer
+from sprocket.speech import FeatureCache, FeatureExtractor, Synthesizer
 from sprocket.util import HDF5, static_delta
 
-from .misc import low_cut_filter
+from .misc import compiled_model_name, low_cut_filter
 from .yml import PairYML, SpeakerYML
 
 
@@ -29,6 +29,14 @@ def main(*argv):
     parser = argparse.ArgumentParser(description=description)
     parser.add_argument('-gmmmode', '--gmmmode', type=str, default=None,
                         help='mode of the GMM [None, diff, or intra]')
+    parser.add_argument('--chunklen', type=int, default=None,
+                        help='Convert mcep in chunks of the number of frames')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='The number of processes for chunked conversion')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Directory of cache of acoustic features')
+    parser.add_argument('--float32', default=False, action='store_true',
+                        help='Convert mcep in float32')
     parser.add_argument('org', type=str,
                         help='Original speaker')
     parser.add_argument('tar', type=str,
@@ -50,13 +58,20 @@ def main(*argv):
     pconf = PairYML(args.pair_yml)
 
     # read GMM for mcep
-    mcepgmmpath = os.path.join(args.pair_dir, 'model/GMM_mcep.pkl')
     mcepgmm = GMMConvertor(n_mix=pconf.GMM_mcep_n_mix,
                            covtype=pconf.GMM_mcep_covtype,
                            gmmmode=args.gmmmode,
+                           dtype=np.float32 if args.float32 else np.float64,
                            )
-    param = joblib.load(mcepgmmpath)
-    mcepgmm.open_from_param(param)
+    cvgmmpath = os.path.join(args.pair_dir, 'model',
+                             compiled_model_name(args.gmmmode))
+    if os.path.exists(cvgmmpath):
+        # open compiled conversion model
+        mcepgmm.open_from_file(cvgmmpath)
+    else:
+        mcepgmmpath = os.path.join(args.pair_dir, 'model/GMM_mcep.pkl')
+        param = joblib.load(mcepgmmpath)
+        mcepgmm.open_from_param(param)
     print("GMM for mcep conversion mode: {}".format(args.gmmmode))
 
     # read F0 statistics
@@ -84,12 +99,14 @@ def main(*argv):
     f0stats = F0statistics()
 
     # constract FeatureExtractor class
+    cache = None if args.cache_dir is None else FeatureCache(args.cache_dir)
     feat = FeatureExtractor(analyzer=sconf.analyzer,
                             fs=sconf.wav_fs,
                             fftl=sconf.wav_fftl,
                             shiftms=sconf.wav_shiftms,
                             minf0=sconf.f0_minf0,
-                            maxf0=sconf.f0_maxf0)
+                            maxf0=sconf.f0_maxf0,
+                            cache=cache)
 
     # constract Synthesizer class
     synthesizer = Synthesizer(fs=sconf.wav_fs,
@@ -122,8 +139,15 @@ def main(*argv):
             cvf0 = f0stats.convert(f0, orgf0stats, tarf0stats)
 
             # convert mcep
-            cvmcep_wopow = mcepgmm.convert(static_delta(mcep[:, 1:]),
-                                           cvtype=pconf.GMM_mcep_cvtype)
+            if args.chunklen is None:
+                cvmcep_wopow = mcepgmm.convert(static_delta(mcep[:, 1:]),
+                                               cvtype=pconf.GMM_mcep_cvtype)
+            else:
+                cvmcep_wopow = mcepgmm.convert_chunked(
+                    static_delta(mcep[:, 1:]),
+                    cvtype=pconf.GMM_mcep_cvtype,
+                    chunklen=args.chunklen,
+                    n_jobs=args.jobs)
             cvmcep = np.c_[mcep_0th, cvmcep_wopow]
 
             # synthesis VC w/ GV
@@ -10,6 +10,8 @@ import argparse
 import os
 import sys
 
+import numpy as np
+
 from sprocket.model.GMM import GMMConvertor, GMMTrainer
 from sprocket.util import HDF5, estimate_twf, melcd
 from sprocket.util import static_delta, align_data
@@ -74,10 +76,55 @@ def get_alignment(odata, onpow, tdata, tnpow, opow=-20, tpow=-20,
                         power_threshold=tpow)
 
     if cvdata is None:
-        align_odata = oexdata
+        cvexdata = None
     else:
         cvexdata = extsddata(cvdata, onpow,
                              power_threshold=opow)
+
+    return align_extsddata(oexdata, texdata, cvexdata=cvexdata,
+                           given_twf=given_twf, otflag=otflag,
+                           distance=distance)
+
+
+def align_extsddata(oexdata, texdata, cvexdata=None, given_twf=None,
+                    otflag=None, distance='melcd'):
+    """Get alignment between silence removed static and delta features
+
+    Paramters
+    ---------
+    oexdata : array, shape (`T_org`, `dim * 2`)
+        Silence removed static and delta feature vector of original
+    texdata : array, shape (`T_tar`, `dim * 2`)
+        Silence removed static and delta feature vector of target
+    cvexdata : array, shape (`T_org`, `dim * 2`), optional,
+        Silence removed static and delta feature vector of
+        converted original data
+        Default set to None
+    given_twf : array, shape (`T_new`, `dim * 2`), optional,
+        Alignment given twf
+        Default set to None
+    otflag : str, optional
+        Alignment into the length of specification
+        'org' : alignment into original length
+        'tar' : alignment into target length
+        Default set to None
+    distance : str,
+        Distance function to be used
+        Default set to 'melcd'
+
+    Returns
+    -------
+    jdata : array, shape (`T_new` `dim * 2`)
+        Joint static and delta feature vector
+    twf : array, shape (`T_new` `dim * 2`)
+        Time warping function
+    mcd : float,
+        Mel-cepstrum distortion between arrays
+
+    """
+    if cvexdata is None:
+        align_odata = oexdata
+    else:
         align_odata = cvexdata
 
     if given_twf is None:
@@ -94,7 +141,7 @@ def get_alignment(odata, onpow, tdata, tnpow, opow=-20, tpow=-20,
 
 def align_feature_vectors(odata, onpows, tdata, tnpows, pconf,
                           opow=-100, tpow=-100, itnum=3, sd=0,
-                          given_twfs=None, otflag=None):
+                          given_twfs=None, otflag=None, warm_n_iter=10):
     """Get alignment to create joint feature vector
 
     Paramters
@@ -127,6 +174,10 @@ def align_feature_vectors(odata, onpows, tdata, tnpows, pconf,
         'org' : alignment into original length
         'tar' : alignment into target length
         Default set to None
+    warm_n_iter : int, optional
+        The number of EM iterations for the GMM after the 2nd iteration,
+        which starts from the GMM of the previous iteration
+        Default set to 10
 
     Returns
     -------
@@ -136,28 +187,35 @@ def align_feature_vectors(odata, onpows, tdata, tnpows, pconf,
         List of time warping functions
     """
     num_files = len(odata)
-    cvgmm, cvdata = None, None
+
+    # static and delta features and silence masks do not change
+    # through iterations
+    osddata = [static_delta(odata[i][:, sd:]) for i in range(num_files)]
+    omasks = [onpows[i] > opow for i in range(num_files)]
+    oexdata = [osddata[i][omasks[i]] for i in range(num_files)]
+    texdata = [extsddata(tdata[i][:, sd:], tnpows[i], power_threshold=tpow)
+               for i in range(num_files)]
+
+    datagmm, cvexdata = None, None
     for it in range(1, itnum + 1):
         print('{}-th joint feature extraction starts.'.format(it))
+        if it > 1:
+            cvdata = cvgmm.convert_batch(osddata,
+                                         cvtype=pconf.GMM_mcep_cvtype)
+            cvexdata = [static_delta(cvdata[i])[omasks[i]]
+                        for i in range(num_files)]
         twfs, jfvs = [], []
         for i in range(num_files):
             if it == 1 and given_twfs is not None:
                 gtwf = given_twfs[i]
             else:
                 gtwf = None
-            if it > 1:
-                cvdata = cvgmm.convert(static_delta(odata[i][:, sd:]),
-                                       cvtype=pconf.GMM_mcep_cvtype)
-            jdata, twf, mcd = get_alignment(odata[i],
-                                            onpows[i],
-                                            tdata[i],
-                                            tnpows[i],
-                                            opow=opow,
-                                            tpow=tpow,
-                                            sd=sd,
-                                            cvdata=cvdata,
-                                            given_twf=gtwf,
-                                            otflag=otflag)
+            jdata, twf, mcd = align_extsddata(
+                oexdata[i],
+                texdata[i],
+                cvexdata=None if cvexdata is None else cvexdata[i],
+                given_twf=gtwf,
+                otflag=otflag)
             twfs.append(twf)
             jfvs.append(jdata)
             print('distortion [dB] for {}-th file: {}'.format(i + 1, mcd))
@@ -165,14 +223,18 @@ def align_feature_vectors(odata, onpows, tdata, tnpows, pconf,
 
         if it != itnum:
             # train GMM, if not final iteration
-            datagmm = GMMTrainer(n_mix=pconf.GMM_mcep_n_mix,
-                                 n_iter=pconf.GMM_mcep_n_iter,
-                                 covtype=pconf.GMM_mcep_covtype)
-            datagmm.train(jnt_data)
+            if datagmm is None:
+                datagmm = GMMTrainer(n_mix=pconf.GMM_mcep_n_mix,
+                                     n_iter=pconf.GMM_mcep_n_iter,
+                                     covtype=pconf.GMM_mcep_covtype)
+                datagmm.train(jnt_data)
+            else:
+                # warm-start from the GMM of the previous iteration
+                datagmm.n_iter = warm_n_iter
+                datagmm.train(jnt_data, warm_start=True)
             cvgmm = GMMConvertor(n_mix=pconf.GMM_mcep_n_mix,
                                  covtype=pconf.GMM_mcep_covtype)
             cvgmm.open_from_param(datagmm.param)
-        it += 1
     return jfvs, twfs
 
 
@@ -181,6 +243,8 @@ def main(*argv):
     # Options for python
     description = 'estimate joint feature of source and target speakers'
     parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--float32', default=False, action='store_true',
+                        help='Save joint feature vectors in float32')
     parser.add_argument('org_yml', type=str,
                         help='Yml file of the original speaker')
     parser.add_argument('tar_yml', type=str,
@@ -247,9 +311,10 @@ def main(*argv):
     jnt_dir = os.path.join(args.pair_dir, 'jnt')
     os.makedirs(jnt_dir, exist_ok=True)
     jntpath = os.path.join(jnt_dir, 'it' + str(pconf.jnt_n_iter) + '_jnt.h5')
+    dtype = np.float32 if args.float32 else None
     jnth5 = HDF5(jntpath, mode='a')
-    jnth5.save(jnt_mcep, ext='mcep')
-    jnth5.save(jnt_codeap, ext='codeap')
+    jnth5.save(jnt_mcep, ext='mcep', dtype=dtype)
+    jnth5.save(jnt_codeap, ext='codeap', dtype=dtype)
     jnth5.close()
 
     # save twfs
@@ -9,24 +9,149 @@ Extract acoustic features for the speaker
 import argparse
 import os
 import sys
+import time
+from multiprocessing import Pool
 
 import numpy as np
 from scipy.io import wavfile
 
-from sprocket.speech import FeatureExtractor, Synthesizer
+from sprocket.speech import FeatureCache, FeatureExtractor, Synthesizer
 from sprocket.util import HDF5
 
-from .misc import low_cut_filter
-from .yml import SpeakerYML
+from .misc import link_feature_dir, low_cut_filter
+from .yml import SpeakerYML, check_feature_config
+
+
+def extract_features(f, sconf, wav_dir, h5_dir, anasyn_dir, cache=None,
+                     dtype=None):
+    """Extract acoustic features of the wav file and save them into h5 file
+    The h5 file and the analysis-synthesis wav file are written into
+    temporary files and renamed, so that an interrupted extraction does
+    not leave broken files. The h5 file is renamed at last.
+
+    Parameters
+    ---------
+    f : str
+        File label in the list file
+    sconf : SpeakerYML
+        Class of SpeakerYML
+    wav_dir : str
+        Wav file directory of the speaker
+    h5_dir : str
+        Directory of h5 files
+    anasyn_dir : str
+        Directory of analysis-synthesis wav files
+    cache : FeatureCache, optional
+        Cache of acoustic features
+        Default set to None
+    dtype : data-type, optional
+        Data type of the saved mcep and codeap, e.g., `np.float32`
+        `None` : float64
+        Default set to None
+
+    Returns
+    ---------
+    elapsed : float
+        Elapsed time [sec] to extract the features
+    duration : float
+        Duration [sec] of the wav file
+
+    """
+    stime = time.perf_counter()
+
+    # constract FeatureExtractor class
+    feat = FeatureExtractor(analyzer=sconf.analyzer,
+                            fs=sconf.wav_fs,
+                            fftl=sconf.wav_fftl,
+                            shiftms=sconf.wav_shiftms,
+                            minf0=sconf.f0_minf0,
+                            maxf0=sconf.f0_maxf0,
+                            cache=cache)
+
+    # constract Synthesizer class
+    synthesizer = Synthesizer(fs=sconf.wav_fs,
+                              fftl=sconf.wav_fftl,
+                              shiftms=sconf.wav_shiftms)
+
+    wavf = os.path.join(wav_dir, f + '.wav')
+    fs, x = wavfile.read(wavf)
+    x = np.array(x, dtype=np.float64)
+    x = low_cut_filter(x, fs, cutoff=70)
+    assert fs == sconf.wav_fs
+
+    # analyze F0, spc, and ap
+    feats = feat.extract(x, features=['f0', 'ap', 'mcep', 'npow', 'codeap'],
+                         dim=sconf.mcep_dim, alpha=sconf.mcep_alpha)
+    f0, ap, mcep = feats.f0, feats.ap, feats.mcep
+    npow, codeap = feats.npow, feats.codeap
+
+    # analysis/synthesis using F0, mcep, and ap
+    wav = synthesizer.synthesis(f0,
+                                mcep,
+                                ap,
+                                alpha=sconf.mcep_alpha,
+                                )
+    wav = np.clip(wav, -32768, 32767)
+    anasynf = os.path.join(anasyn_dir, f + '.wav')
+    wavfile.write(anasynf + '.tmp', fs, np.array(wav, dtype=np.int16))
+    os.replace(anasynf + '.tmp', anasynf)
+
+    # save features into a hdf5 file
+    h5f = os.path.join(h5_dir, f + '.h5')
+    h5 = HDF5(h5f + '.tmp', mode='w')
+    h5.save(f0, ext='f0')
+    # h5.save(spc, ext='spc')
+    # h5.save(ap, ext='ap')
+    h5.save(mcep, ext='mcep', dtype=dtype)
+    h5.save(npow, ext='npow')
+    h5.save(codeap, ext='codeap', dtype=dtype)
+    h5.close()
+    os.replace(h5f + '.tmp', h5f)
+
+    return time.perf_counter() - stime, len(x) / fs
+
+
+def _extract_features(args):
+    # unpack arguments for Pool.imap
+    return extract_features(*args)
+
+
+def report_timing(files, results, wav_dir):
+    """Print elapsed time of feature extraction of each file
+
+    Parameters
+    ---------
+    files : list
+        List of file labels
+    results : iterator
+        Iterator of elapsed time and duration of each file
+    wav_dir : str
+        Wav file directory of the speaker
+
+    """
+    for f, (elapsed, duration) in zip(files, results):
+        wavf = os.path.join(wav_dir, f + '.wav')
+        print("Extract acoustic features: {} ({:.2f} sec for {:.2f} sec "
+              "of speech)".format(wavf, elapsed, duration))
 
 
 def main(*argv):
-    argv = argv if argv else sys.argv
+    argv = argv if argv else sys.argv[1:]
     # Options for python
     dcp = 'Extract aoucstic features for the speaker'
     parser = argparse.ArgumentParser(description=dcp)
     parser.add_argument('--overwrite', default=False, action='store_true',
                         help='Overwrite h5 file')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of processes for feature extraction')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Directory of cache of acoustic features')
+    parser.add_argument('--float32', default=False, action='store_true',
+                        help='Save mcep and codeap in float32')
+    parser.add_argument('--store_dir', type=str, default=None,
+                        help='Directory of feature store shared by speaker '
+                        'pairs, where the features of the speaker are '
+                        'extracted once and referred from the pair')
     parser.add_argument('speaker', type=str,
                         help='Input speaker label')
     parser.add_argument('ymlf', type=str,
@@ -41,69 +166,55 @@ def main(*argv):
 
     # read parameters from speaker yml
     sconf = SpeakerYML(args.ymlf)
-    h5_dir = os.path.join(args.pair_dir, 'h5')
-    anasyn_dir = os.path.join(args.pair_dir, 'anasyn')
+    feature_dir = args.pair_dir if args.store_dir is None else args.store_dir
+    h5_dir = os.path.join(feature_dir, 'h5')
+    anasyn_dir = os.path.join(feature_dir, 'anasyn')
     if not os.path.exists(os.path.join(h5_dir, args.speaker)):
         os.makedirs(os.path.join(h5_dir, args.speaker))
     if not os.path.exists(os.path.join(anasyn_dir, args.speaker)):
         os.makedirs(os.path.join(anasyn_dir, args.speaker))
 
-    # constract FeatureExtractor class
-    feat = FeatureExtractor(analyzer=sconf.analyzer,
-                            fs=sconf.wav_fs,
-                            fftl=sconf.wav_fftl,
-                            shiftms=sconf.wav_shiftms,
-                            minf0=sconf.f0_minf0,
-                            maxf0=sconf.f0_maxf0)
+    if args.store_dir is not None:
+        # features in the store have to be extracted with same parameters
+        check_feature_config(
+            os.path.join(args.store_dir, 'conf', args.speaker + '.yml'),
+            sconf, dtype='float32' if args.float32 else 'float64')
 
-    # constract Synthesizer class
-    synthesizer = Synthesizer(fs=sconf.wav_fs,
-                              fftl=sconf.wav_fftl,
-                              shiftms=sconf.wav_shiftms)
+        # refer to the features of the speaker from the pair
+        for sub_dir in [h5_dir, anasyn_dir]:
+            link_feature_dir(
+                os.path.join(sub_dir, args.speaker),
+                os.path.join(args.pair_dir, os.path.basename(sub_dir),
+                             args.speaker))
 
     # open list file
+    files = []
     with open(args.list_file, 'r') as fp:
         for line in fp:
             f = line.rstrip()
             h5f = os.path.join(h5_dir, f + '.h5')
-
             if (not os.path.exists(h5f)) or args.overwrite:
-                wavf = os.path.join(args.wav_dir, f + '.wav')
-                fs, x = wavfile.read(wavf)
-                x = np.array(x, dtype=np.float)
-                x = low_cut_filter(x, fs, cutoff=70)
-                assert fs == sconf.wav_fs
-
-                print("Extract acoustic features: " + wavf)
-
-                # analyze F0, spc, and ap
-                f0, spc, ap = feat.analyze(x)
-                mcep = feat.mcep(dim=sconf.mcep_dim, alpha=sconf.mcep_alpha)
-                npow = feat.npow()
-                codeap = feat.codeap()
-
-                # save features into a hdf5 file
-                h5 = HDF5(h5f, mode='a')
-                h5.save(f0, ext='f0')
-                # h5.save(spc, ext='spc')
-                # h5.save(ap, ext='ap')
-                h5.save(mcep, ext='mcep')
-                h5.save(npow, ext='npow')
-                h5.save(codeap, ext='codeap')
-                h5.close()
-
-                # analysis/synthesis using F0, mcep, and ap
-                wav = synthesizer.synthesis(f0,
-                                            mcep,
-                                            ap,
-                                            alpha=sconf.mcep_alpha,
-                                            )
-                wav = np.clip(wav, -32768, 32767)
-                anasynf = os.path.join(anasyn_dir, f + '.wav')
-                wavfile.write(anasynf, fs, np.array(wav, dtype=np.int16))
+                files.append(f)
             else:
                 print("Acoustic features already exist: " + h5f)
 
+    # extract features in parallel, whose results are reported in order
+    # of the list file
+    cache = None if args.cache_dir is None else FeatureCache(args.cache_dir)
+    dtype = np.float32 if args.float32 else None
+    tasks = [(f, sconf, args.wav_dir, h5_dir, anasyn_dir, cache, dtype)
+             for f in files]
+    stime = time.perf_counter()
+    if args.jobs == 1:
+        report_timing(files, map(_extract_features, tasks), args.wav_dir)
+    else:
+        with Pool(args.jobs) as p:
+            report_timing(files, p.imap(_extract_features, tasks),
+                          args.wav_dir)
+    if len(files) > 0:
+        print("Extracted acoustic features of {} files in {:.2f} sec".format(
+            len(files), time.perf_counter() - stime))
+
 
 if __name__ == '__main__':
     main()
@@ -15,13 +15,13 @@ import numpy as np
 from scipy.io import wavfile
 
 from sprocket.model import F0statistics
-from sprocket.speech import FeatureExtractor, Shifter
+from sprocket.speech import FeatureCache, FeatureExtractor, Shifter
 
 from .misc import low_cut_filter
 from .yml import SpeakerYML
 
 
-def get_f0s_from_list(conf, list_file, wav_dir):
+def get_f0s_from_list(conf, list_file, wav_dir, cache=None):
     """Get f0s from listfile
 
     Parameters
@@ -32,6 +32,9 @@ def get_f0s_from_list(conf, list_file, wav_dir):
         File path of the list file of the speaker
     wav_dir : str, path-like,
         Directory path of the waveform
+    cache : FeatureCache, optional,
+        Cache of acoustic features
+        Default set to None
 
     Returns
     ---------
@@ -49,7 +52,7 @@ def get_f0s_from_list(conf, list_file, wav_dir):
         f = f.rstrip()
         wavf = os.path.join(wav_dir, f + '.wav')
         fs, x = wavfile.read(wavf)
-        x = np.array(x, dtype=np.float)
+        x = np.array(x, dtype=np.float64)
         x = low_cut_filter(x, fs, cutoff=70)
         assert fs == conf.wav_fs
 
@@ -57,7 +60,8 @@ def get_f0s_from_list(conf, list_file, wav_dir):
         # constract FeatureExtractor clas
         feat = FeatureExtractor(analyzer=conf.analyzer, fs=conf.wav_fs,
                                 fftl=conf.wav_fftl, shiftms=conf.wav_shiftms,
-                                minf0=conf.f0_minf0, maxf0=conf.f0_maxf0)
+                                minf0=conf.f0_minf0, maxf0=conf.f0_maxf0,
+                                cache=cache)
         f0 = feat.analyze_f0(x)
         f0s.append(f0)
 
@@ -133,6 +137,8 @@ def main(*argv):
                         help='Original speaker label')
     parser.add_argument('--evlist', default=False, action='store_true',
                         help='Transform wavforms only for evaluation list')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Directory of cache of acoustic features')
     parser.add_argument('speaker', type=str,
                         help='Original speaker label')
     parser.add_argument('org_yml', type=str,
@@ -155,10 +161,11 @@ def main(*argv):
 
     if args.f0rate == -1:
         # get f0 list to calculate F0 transformation ratio
+        cache = None if args.cache_dir is None else FeatureCache(args.cache_dir)
         org_f0s = get_f0s_from_list(
-            org_conf, args.org_train_list, args.wav_dir)
+            org_conf, args.org_train_list, args.wav_dir, cache=cache)
         tar_f0s = get_f0s_from_list(
-            tar_conf, args.tar_train_list, args.wav_dir)
+            tar_conf, args.tar_train_list, args.wav_dir, cache=cache)
 
         # calculate F0 statistics of original and target speaker
         f0stats = F0statistics()
@@ -14,7 +14,7 @@ import matplotlib
 import numpy as np
 from scipy.io import wavfile
 
-from sprocket.speech import FeatureExtractor
+from sprocket.speech import FeatureCache, FeatureExtractor
 
 matplotlib.use('Agg')  # noqa #isort:skip
 import matplotlib.pyplot as plt  # isort:skip
@@ -64,6 +64,8 @@ def main(*argv):
     argv = argv if argv else sys.argv[1:]
     dcp = 'Create histogram for speaker-dependent configure'
     parser = argparse.ArgumentParser(description=dcp)
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='Directory of cache of acoustic features')
     parser.add_argument('speaker', type=str,
                         help='Input speaker label')
     parser.add_argument('list_file', type=str,
@@ -78,6 +80,7 @@ def main(*argv):
     with open(args.list_file, 'r') as fp:
         files = fp.readlines()
 
+    cache = None if args.cache_dir is None else FeatureCache(args.cache_dir)
     f0s = []
     npows = []
     for f in files:
@@ -89,7 +92,7 @@ def main(*argv):
         print("Extract: " + wavf)
 
         # constract FeatureExtractor class
-        feat = FeatureExtractor(analyzer='world', fs=fs)
+        feat = FeatureExtractor(analyzer='world', fs=fs, cache=cache)
 
         # f0 and npow extraction
         f0, _, _ = feat.analyze(x)
@@ -68,6 +68,55 @@ def read_feats(listf, h5dir, ext='mcep'):
     return datalist
 
 
+def link_feature_dir(store_dir, pair_dir):
+    """Refer to a directory of a feature store from a speaker pair
+
+    Parameters
+    ---------
+    store_dir : str,
+        Directory of the speaker in the feature store
+    pair_dir : str,
+        Directory of the speaker in the speaker pair, which is replaced
+        with a symbolic link to `store_dir`
+
+    """
+    if os.path.islink(pair_dir):
+        if os.path.realpath(pair_dir) == os.path.realpath(store_dir):
+            return
+        os.remove(pair_dir)
+    elif os.path.isdir(pair_dir):
+        if len(os.listdir(pair_dir)) > 0:
+            raise ValueError(
+                pair_dir + ' already has features. Please remove it to '
+                'refer to the feature store.')
+        os.rmdir(pair_dir)
+
+    os.makedirs(os.path.dirname(pair_dir), exist_ok=True)
+    os.symlink(os.path.abspath(store_dir), pair_dir)
+
+
+def compiled_model_name(gmmmode=None):
+    """File name of compiled conversion model for mcep
+
+    Parameters
+    ---------
+    gmmmode : str, optional
+        `None` : Normal VC
+        `diff` : Differential VC
+        Default set to `None`
+
+    Returns
+    ---------
+    fname : str
+        File name of the compiled conversion model
+
+    """
+
+    if gmmmode is None:
+        return 'GMM_mcep.h5'
+    return 'GMM_mcep_' + gmmmode + '.h5'
+
+
 def extsddata(data, npow, power_threshold=-20):
     """Get power extract static and delta feature vector
 
@@ -94,10 +143,4 @@ def extsddata(data, npow, power_threshold=-20):
 
 
 def transform_jnt(array_list):
-    num_files = len(array_list)
-    for i in range(num_files):
-        if i == 0:
-            jnt = array_list[i]
-        else:
-            jnt = np.r_[jnt, array_list[i]]
-    return jnt
+    return np.concatenate(array_list, axis=0)
@@ -14,10 +14,10 @@ import numpy as np
 import joblib
 
 from sprocket.model import GV, GMMConvertor, GMMTrainer
-from sprocket.util import HDF5, static_delta
+from sprocket.util import HDF5, construct_coreset, static_delta
 from yml import PairYML
 
-from .misc import read_feats
+from .misc import compiled_model_name, read_feats
 
 
 def feature_conversion(pconf, org_mceps, gmm, gmmmode=None):
@@ -50,12 +50,13 @@ def feature_conversion(pconf, org_mceps, gmm, gmmmode=None):
     cvgmm.open_from_param(gmm.param)
 
     sd = 1  # start dimension to convert
+    cvmceps_wopow = cvgmm.convert_batch(
+        [static_delta(mcep[:, sd:]) for mcep in org_mceps],
+        cvtype=pconf.GMM_mcep_cvtype)
     cv_mceps = []
-    for mcep in org_mceps:
+    for mcep, cvmcep_wopow in zip(org_mceps, cvmceps_wopow):
         mcep_0th = mcep[:, 0]
-        cvmcep = cvgmm.convert(static_delta(mcep[:, sd:]),
-                               cvtype=pconf.GMM_mcep_cvtype)
-        cvmcep = np.c_[mcep_0th, cvmcep]
+        cvmcep = np.c_[mcep_0th, cvmcep_wopow]
         if gmmmode == 'diff':
             cvmcep[:, sd:] += mcep[:, sd:]
         elif gmmmode is not None:
@@ -76,6 +77,25 @@ def main(*argv):
                         help='Yml file of the speaker pair')
     parser.add_argument('pair_dir', type=str,
                         help='Directory path of h5 files')
+    parser.add_argument('--batchsize', type=int, default=None,
+                        help='Mini-batch size for online training of GMM '
+                        'reading joint feature vector from h5 file')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of processes for training of GMM')
+    parser.add_argument('--coreset', type=int, default=None,
+                        help='Number of frames sampled for weighted coreset '
+                        'of joint feature vector used for training of GMM')
+    parser.add_argument('--float32', action='store_true',
+                        help='Perform E-step of training of GMM in float32')
+    parser.add_argument('--n_init', type=int, default=1,
+                        help='Number of restarts of training of GMM, '
+                        'where the GMM of the highest likelihood is kept')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for initialization of GMM')
+    parser.add_argument('--save_stats', default=False, action='store_true',
+                        help='Save sufficient statistics of GMM for '
+                        'incremental update and adaptation, which requires '
+                        'an additional pass over joint feature vector')
     args = parser.parse_args(argv)
 
     # read pair-dependent yml file
@@ -85,20 +105,47 @@ def main(*argv):
     jntf = os.path.join(args.pair_dir, 'jnt',
                         'it' + str(pconf.jnt_n_iter) + '_jnt.h5')
     jnth5 = HDF5(jntf, mode='r')
-    jnt = jnth5.read(ext='mcep')
-    jnt_codeap = jnth5.read(ext='codeap')
+    dtype = np.float32 if args.float32 else np.float64
 
     # train GMM for mcep using joint feature vector
     gmm = GMMTrainer(n_mix=pconf.GMM_mcep_n_mix,
                      n_iter=pconf.GMM_mcep_n_iter,
-                     covtype=pconf.GMM_mcep_covtype)
-    gmm.train(jnt)
+                     covtype=pconf.GMM_mcep_covtype,
+                     dtype=dtype,
+                     n_init=args.n_init,
+                     random_state=args.seed)
 
     # train GMM for codeap using joint feature vector
     gmm_codeap = GMMTrainer(n_mix=pconf.GMM_codeap_n_mix,
                             n_iter=pconf.GMM_codeap_n_iter,
-                            covtype=pconf.GMM_codeap_covtype)
-    gmm_codeap.train(jnt_codeap)
+                            covtype=pconf.GMM_codeap_covtype,
+                            dtype=dtype,
+                            n_init=args.n_init,
+                            random_state=args.seed)
+
+    if args.coreset is not None:
+        # train GMM on weighted coreset of joint feature vector
+        for trainer, ext in [(gmm, 'mcep'), (gmm_codeap, 'codeap')]:
+            jnt, weights = construct_coreset(
+                np.asarray(jnth5.read(ext=ext), dtype=dtype), args.coreset)
+            trainer.train(jnt, n_jobs=args.jobs, sample_weight=weights)
+    elif args.batchsize is None:
+        # joint feature vector saved in float32 is read without copy
+        gmm.train(np.asarray(jnth5.read(ext='mcep'), dtype=dtype),
+                  n_jobs=args.jobs)
+        gmm_codeap.train(np.asarray(jnth5.read(ext='codeap'), dtype=dtype),
+                         n_jobs=args.jobs)
+    else:
+        # stream joint feature vector from h5 file in mini-batches
+        gmm.train_online(jnth5.h5['mcep'], batchsize=args.batchsize)
+        gmm_codeap.train_online(jnth5.h5['codeap'],
+                                batchsize=args.batchsize)
+
+    if args.save_stats:
+        # sufficient statistics for incremental update and adaptation
+        gmm.estimate_statistics(jnth5.h5['mcep'])
+        gmm_codeap.estimate_statistics(jnth5.h5['codeap'])
+    jnth5.close()
 
     # save GMM
     gmm_dir = os.path.join(args.pair_dir, 'model')
@@ -112,6 +159,21 @@ def main(*argv):
     joblib.dump(gmm_codeap.param, gmmpath_codeap)
     print("Conversion model for codeap save into " + gmmpath_codeap)
 
+    if args.save_stats:
+        gmm.stats.save(os.path.join(gmm_dir, 'GMM_mcep_stats.h5'))
+        gmm_codeap.stats.save(os.path.join(gmm_dir, 'GMM_codeap_stats.h5'))
+
+    # export compiled conversion models for mcep
+    for gmmmode in [None, 'diff']:
+        cvgmm = GMMConvertor(n_mix=pconf.GMM_mcep_n_mix,
+                             covtype=pconf.GMM_mcep_covtype,
+                             gmmmode=gmmmode,
+                             )
+        cvgmm.open_from_param(gmm.param)
+        cvgmmpath = os.path.join(gmm_dir, compiled_model_name(gmmmode))
+        cvgmm.export(cvgmmpath)
+        print("Compiled conversion model for mcep save into " + cvgmmpath)
+
     # calculate GV statistics of converted feature
     h5_dir = os.path.join(args.pair_dir, 'h5')
     org_mceps = read_feats(args.org_list_file, h5_dir, ext='mcep')
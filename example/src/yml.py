@@ -29,10 +29,69 @@ class SpeakerYML(object):
 
         self.analyzer = conf['analyzer']
 
+    def feature_config(self):
+        """Return parameters affecting extracted acoustic features
+
+        Returns
+        ---------
+        config : dict
+            Parameters of analysis and parameterization
+
+        """
+        return {'analyzer': self.analyzer,
+                'fs': self.wav_fs,
+                'fftl': self.wav_fftl,
+                'shiftms': self.wav_shiftms,
+                'minf0': self.f0_minf0,
+                'maxf0': self.f0_maxf0,
+                'mcep_dim': self.mcep_dim,
+                'mcep_alpha': self.mcep_alpha,
+                }
+
     def print_params(self):
         pass
 
 
+def check_feature_config(confpath, sconf, dtype='float64'):
+    """Check compatibility of features in a feature store
+
+    The feature configuration of the speaker is saved into `confpath`
+    at first, and compared with it afterward, so that features extracted
+    with different configurations or data types are not mixed in the
+    store.
+
+    Parameters
+    ---------
+    confpath : str
+        Path of yml file of the feature configuration in the store
+    sconf : SpeakerYML
+        Class of SpeakerYML
+    dtype : str, optional
+        Data type of the saved mcep and codeap
+        Default set to 'float64'
+
+    """
+    config = sconf.feature_config()
+    config['dtype'] = dtype
+    if os.path.exists(confpath):
+        with open(confpath) as yf:
+            stored = yaml.safe_load(yf)
+        # features were saved in float64 before the data type was recorded
+        stored.setdefault('dtype', 'float64')
+        mismatch = sorted(k for k in config if stored.get(k) != config[k])
+        if len(mismatch) > 0:
+            raise ValueError(
+                'Feature configuration is incompatible with {}: {}'.format(
+                    confpath, ', '.join(
+                        '{} ({} != {})'.format(k, stored.get(k), config[k])
+                        for k in mismatch)))
+    else:
+        os.makedirs(os.path.dirname(confpath), exist_ok=True)
+        with open(confpath + '.tmp', 'w') as yf:
+            yaml.safe_dump(config, yf, default_flow_style=False)
+        os.replace(confpath + '.tmp', confpath)
+
+
 class PairYML(object):
 
     def __init__(self, ymlf):
@@ -0,0 +1,37 @@
+import unittest
+
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src import extract_features  # noqa: E402
+
+exampledir = os.path.join(os.path.dirname(__file__), '..')
+wavpath = os.path.join(exampledir, '..', 'sprocket', 'speech', 'tests',
+                       'data', 'test16000.wav')
+confpath = os.path.join(exampledir, 'conf', 'default',
+                        'speaker_default_16000.yml')
+
+
+class ExtractFeaturesTest(unittest.TestCase):
+
+    def test_extract_features_jobs_with_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            wav_dir = os.path.join(tmpdir, 'wav')
+            os.makedirs(os.path.join(wav_dir, 'spk'))
+            listf = os.path.join(tmpdir, 'spk.list')
+            with open(listf, 'w') as fp:
+                for f in ['spk/0', 'spk/1']:
+                    shutil.copy(wavpath, os.path.join(wav_dir, f + '.wav'))
+                    fp.write(f + '\n')
+            cache_dir = os.path.join(tmpdir, 'cache')
+            pair_dir = os.path.join(tmpdir, 'pair')
+
+            extract_features.main('--jobs', '2', '--cache_dir', cache_dir,
+                                  'spk', confpath, listf, wav_dir, pair_dir)
+            for f in ['0', '1']:
+                assert os.path.exists(
+                    os.path.join(pair_dir, 'h5', 'spk', f + '.h5'))
+            assert len(os.listdir(cache_dir)) > 0
@@ -0,0 +1,72 @@
+import unittest
+
+import os
+import sys
+import tempfile
+
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from src.misc import link_feature_dir  # noqa: E402
+from src.yml import SpeakerYML, check_feature_config  # noqa: E402
+
+confpath = os.path.join(os.path.dirname(__file__), '..', 'conf', 'default',
+                        'speaker_default_16000.yml')
+
+
+class FeatureStoreTest(unittest.TestCase):
+
+    def test_check_feature_config(self):
+        sconf = SpeakerYML(confpath)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            storeconf = os.path.join(tmpdir, 'conf', 'spk.yml')
+            check_feature_config(storeconf, sconf)
+            assert os.path.exists(storeconf)
+            check_feature_config(storeconf, sconf)
+
+            # features in different data type
+            with self.assertRaisesRegex(ValueError, 'dtype'):
+                check_feature_config(storeconf, sconf, dtype='float32')
+
+            # store created before the data type was recorded
+            with open(storeconf) as yf:
+                stored = yaml.safe_load(yf)
+            del stored['dtype']
+            with open(storeconf, 'w') as yf:
+                yaml.safe_dump(stored, yf)
+            check_feature_config(storeconf, sconf)
+
+            # incompatible configuration
+            sconf.mcep_dim += 1
+            with self.assertRaisesRegex(ValueError, 'mcep_dim'):
+                check_feature_config(storeconf, sconf)
+            with open(storeconf) as yf:
+                assert yaml.safe_load(yf)['mcep_dim'] == sconf.mcep_dim - 1
+
+    def test_link_feature_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store_dir = os.path.join(tmpdir, 'store', 'h5', 'spk')
+            other_dir = os.path.join(tmpdir, 'other', 'h5', 'spk')
+            pair_dir = os.path.join(tmpdir, 'pair', 'h5', 'spk')
+            os.makedirs(store_dir)
+            os.makedirs(other_dir)
+
+            # empty directory is replaced with link
+            os.makedirs(pair_dir)
+            link_feature_dir(store_dir, pair_dir)
+            assert os.path.islink(pair_dir)
+            assert os.path.samefile(pair_dir, store_dir)
+
+            # existing link is kept or replaced
+            link_feature_dir(store_dir, pair_dir)
+            assert os.path.samefile(pair_dir, store_dir)
+            link_feature_dir(other_dir, pair_dir)
+            assert os.path.samefile(pair_dir, other_dir)
+
+            # directory with features is not replaced
+            os.remove(pair_dir)
+            os.makedirs(pair_dir)
+            open(os.path.join(pair_dir, '0.h5'), 'w').close()
+            with self.assertRaises(ValueError):
+                link_feature_dir(store_dir, pair_dir)
+            assert os.path.exists(os.path.join(pair_dir, '0.h5'))
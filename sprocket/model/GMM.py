@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import functools
+from multiprocessing import Pool
+
 import numpy as np
+import scipy.linalg
 import scipy.sparse
+import scipy.special
 import sklearn.mixture
-from sklearn.mixture._gaussian_mixture import _compute_precision_cholesky
 
 from sprocket.util.delta import construct_static_and_delta_matrix
+from sprocket.util.hdf5 import HDF5
+from sprocket.util.mlpg import mlpg, mlpg_cg, StreamingMLPG
 from .diagGMM import BlockDiagonalGaussianMixture
+from .gmmstats import GMMStatistics
+
+# version of the file format of compiled conversion model
+COMPILED_MODEL_VERSION = 1
 
 
 class GMMTrainer(object):
@@ -26,32 +37,78 @@ class GMMTrainer(object):
         The type of covariance matrix of the GMM
         'full' : full-covariance matrix
         'block_diag' : block-diagonal matrix
+    dtype : data-type, optional
+        Data type of the E-step. If `np.float32`, the posterior of each
+        shard is computed in float32 by the map-reduce EM algorithm, while
+        the sufficient statistics are accumulated and summed over shards,
+        and the M-step is performed in float64. `train` then always
+        uses the map-reduce EM algorithm, where `sample_weight` is applied
+        by the E-step, so the EM algorithm of the GMM parameter class and
+        its options, e.g., `checkpoint` and `callback` of
+        `BlockDiagonalGaussianMixture.fit`, are not used.
+        Default set to `np.float64`
+    n_init : int, optional
+        The number of restarts of the training from different
+        initializations. The GMM with the highest final lower bound
+        is kept.
+        Default set to 1
+    random_state : int, optional
+        Seed of random number generator for the initialization.
+        The seeds of the restarts are drawn from it.
+        `None` : global random number generator of numpy
+        Default set to `None`
 
     Attributes
     ----------
     param :
         Sklean-based model parameters of the GMM
+    seeds : array, shape (`n_init`)
+        Seeds of the restarts of the last training
+        Available only if `n_init` > 1
+    lower_bounds : array, shape (`n_init`)
+        Final lower bounds of the restarts of the last training
+        Available only if `n_init` > 1
+    stats : GMMStatistics
+        Sufficient statistics of the data which the GMM has been fit to,
+        set by `estimate_statistics` and `update`
 
     """
 
-    def __init__(self, n_mix=32, n_iter=100, covtype="full"):
+    def __init__(self, n_mix=32, n_iter=100, covtype="full", dtype=np.float64,
+                 n_init=1, random_state=None):
         self.n_mix = n_mix
         self.n_iter = n_iter
         self.covtype = covtype
 
-        self.random_state = np.random.mtrand._rand
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            raise ValueError("dtype should be float32 or float64")
+        self.dtype = np.dtype(dtype)
+
+        if n_init < 1:
+            raise ValueError("n_init should be greater than or equal to 1")
+        self.n_init = n_init
+
+        if random_state is None:
+            self.random_state = np.random.mtrand._rand
+        else:
+            self.random_state = np.random.RandomState(random_state)
 
         # construct GMM parameter
+        self.param = self._construct_param(self.n_mix)
+        self.stats = None
+
+    def _construct_param(self, n_mix):
         if self.covtype == "full":
-            self.param = sklearn.mixture.GaussianMixture(
-                n_components=self.n_mix,
+            return sklearn.mixture.GaussianMixture(
+                n_components=n_mix,
                 covariance_type=self.covtype,
                 max_iter=self.n_iter,
+                random_state=self.random_state,
             )
         elif self.covtype == "block_diag":
-            self.param = BlockDiagonalGaussianMixture(
-                n_mix=self.n_mix, n_iter=self.n_iter
-            )
+            param = BlockDiagonalGaussianMixture(n_mix=n_mix, n_iter=self.n_iter)
+            param.random_state = self.random_state
+            return param
         else:
             raise ValueError("Covariance type should be full or block_diag")
 
@@ -67,7 +124,8 @@ class GMMTrainer(object):
         self.param = param
         return
 
-    def train(self, jnt):
+    def train(self, jnt, n_jobs=None, shardsize=100000, warm_start=False,
+              sample_weight=None):
         """Fit GMM parameter from given joint feature vector
 
         Parameters
@@ -75,9 +133,504 @@ class GMMTrainer(object):
         jnt : array, shape(`T`, `dim`)
             Joint feature vector of original and target feature vector
             consisting of static and delta components
+        n_jobs : int, optional
+            The number of processes for the map-reduce EM algorithm,
+            where the E-step and the accumulation of sufficient statistics
+            are performed over shards of `jnt` in parallel, and the M-step
+            is performed from the summed statistics.
+            If `n_init` > 1, the number of processes training the restarts
+            concurrently, each of which runs in a single process.
+            `None` : EM algorithm of the GMM parameter class
+            Default set to `None`
+        shardsize : int, optional
+            The number of frames in a shard for the map-reduce EM algorithm.
+            The result does not depend on `n_jobs` for a fixed `shardsize`.
+            Default set to 100000
+        warm_start : bool, optional
+            If `True`, EM algorithm starts from the current GMM parameter,
+            e.g., opened by `open_from_param`, instead of initialization,
+            and is performed at most `n_iter` iterations of this trainer.
+            Default set to `False`
+        sample_weight : array, shape(`T`), optional
+            Weight of each frame, e.g., weights of coreset.
+            The map-reduce EM algorithm is used for full-covariance GMM.
+            Default set to `None`
+
+        """
+        if warm_start and not hasattr(self.param, "means_"):
+            raise ValueError("Please open param before warm-start training")
+
+        if self.n_init > 1 and not warm_start:
+            self._train_restarts(jnt, n_jobs=n_jobs, shardsize=shardsize,
+                                 sample_weight=sample_weight)
+            return
+
+        fit_kwargs = {}
+        if sample_weight is not None:
+            if isinstance(self.param, BlockDiagonalGaussianMixture):
+                fit_kwargs["sample_weight"] = sample_weight
+            elif n_jobs is None:
+                # sklearn-based EM does not support weighted samples
+                n_jobs = 1
+        if self.dtype == np.float32 and n_jobs is None:
+            # E-step in float32 is performed by the map-reduce EM algorithm,
+            # which takes sample_weight in place of the fit arguments
+            n_jobs = 1
+            fit_kwargs = {}
+
+        if n_jobs is None:
+            if not warm_start:
+                self.param.fit(jnt, **fit_kwargs)
+                return
+
+            # continue EM algorithm of the GMM parameter class
+            self.param.warm_start = True
+            self.param.max_iter = self.n_iter
+            if isinstance(self.param, BlockDiagonalGaussianMixture):
+                self.param.n_iter = self.n_iter
+            self.param.converged_ = False
+            if not hasattr(self.param, "lower_bound_"):
+                self.param.lower_bound_ = -np.inf
+            try:
+                self.param.fit(jnt, **fit_kwargs)
+            finally:
+                self.param.warm_start = False
+            return
+
+        T = len(jnt)
+        shards = [(s, min(s + shardsize, T)) for s in range(0, T, shardsize)]
+        if not warm_start:
+            self.param._initialize_parameters(jnt, self.random_state)
+        total_weight = T if sample_weight is None else np.sum(sample_weight)
+        initargs = (jnt, self.param, self.covtype, sample_weight, self.dtype)
+        if n_jobs == 1:
+            accumulate = functools.partial(
+                _accumulate, jnt, copy.deepcopy(self.param), self.covtype,
+                sample_weight, self.dtype)
+            self._mapreduce_em(
+                functools.partial(map, accumulate), shards, total_weight)
+        else:
+            with Pool(
+                n_jobs, initializer=_init_em_worker, initargs=initargs
+            ) as p:
+                self._mapreduce_em(
+                    functools.partial(p.map, _accumulate_shard), shards,
+                    total_weight)
+
+    def _train_restarts(self, jnt, n_jobs=None, shardsize=100000,
+                        sample_weight=None):
+        """Train GMMs from `n_init` seeds and keep the best one
+
+        Parameters
+        ----------
+        jnt : array, shape(`T`, `dim`)
+            Joint feature vector of original and target feature vector
+        n_jobs : int, optional
+            The number of processes training the restarts concurrently
+            Default set to `None`
+        shardsize : int, optional
+            The number of frames in a shard for the map-reduce EM algorithm
+            Default set to 100000
+        sample_weight : array, shape(`T`), optional
+            Weight of each frame
+            Default set to `None`
+
+        """
+        seeds = self.random_state.randint(
+            np.iinfo(np.int32).max, size=self.n_init)
+        initargs = (self, jnt, shardsize, sample_weight)
+        if n_jobs is None or n_jobs == 1:
+            results = [_restart(*initargs, seed) for seed in seeds]
+        else:
+            with Pool(
+                n_jobs, initializer=_init_restart_worker, initargs=initargs
+            ) as p:
+                results = p.map(_train_restart, seeds)
+
+        # keep the GMM of the highest lower bound, where the first one
+        # is kept for a tie
+        self.seeds = seeds
+        self.lower_bounds = np.array([lower_bound for lower_bound, _ in results])
+        self.param = results[int(np.argmax(self.lower_bounds))][1]
+
+    def _mapreduce_em(self, mapper, shards, total_weight):
+        """EM iterations over shards
+
+        Parameters
+        ----------
+        mapper : function
+            Function applying the E-step and accumulation of sufficient
+            statistics to the list of GMM parameter and shard
+        shards : list
+            List of the start and end frame of the shards
+        total_weight : float
+            Sum of weights of all frames
+
+        """
+        lower_bound = -np.inf
+        self.param.converged_ = False
+        for n in range(self.n_iter):
+            # E-step and accumulation in each shard
+            gmmparam = self.param._get_parameters()
+            results = mapper([(gmmparam, s, e) for s, e in shards])
+
+            # reduce statistics in order of shards
+            stats, log_prob = None, 0.0
+            for shard_stats, shard_log_prob in results:
+                stats = shard_stats if stats is None else stats + shard_stats
+                log_prob += shard_log_prob
+
+            # M-step
+            self._open_statistics(stats)
+
+            # check convergence
+            back_lower_bound = lower_bound
+            lower_bound = log_prob / total_weight
+            if abs(lower_bound - back_lower_bound) < self.param.tol:
+                self.param.converged_ = True
+                break
+
+        self.param.n_iter_ = n + 1
+        self.param.lower_bound_ = lower_bound
+
+    def train_lbg(self, jnt, n_split_iter=5, n_jobs=None, shardsize=100000):
+        """Fit GMM parameter with initialization by mixture splitting
+        Starting from a single Gaussian, each mixture component is split
+        into two along its principal axis, and the GMM is trained by
+        `n_split_iter` iterations of EM algorithm, until the number of
+        mixture components reaches `n_mix`. The GMM of `n_mix` components
+        is trained by `n_iter` iterations.
+
+        Parameters
+        ----------
+        jnt : array, shape(`T`, `dim`)
+            Joint feature vector of original and target feature vector
+            consisting of static and delta components
+        n_split_iter : int, optional
+            The number of EM iterations after each splitting
+            Default set to 5
+        n_jobs : int, optional
+            The number of processes for the map-reduce EM algorithm
+            Default set to `None`
+        shardsize : int, optional
+            The number of frames in a shard for the map-reduce EM algorithm.
+            Default set to 100000
+
+        Returns
+        -------
+        params : list
+            Sklean-based model parameters of the GMM trained at each level,
+            whose numbers of mixture components are 1, 2, 4, ..., `n_mix`
+
+        """
+        # single Gaussian
+        self.param = self._construct_param(1)
+        stats = GMMStatistics(1, jnt.shape[1], covtype=self.covtype)
+        for s in range(0, len(jnt), shardsize):
+            X = np.asarray(jnt[s:s + shardsize], dtype=np.float64)
+            stats.accumulate(X, np.ones((len(X), 1)))
+        self._open_statistics(stats)
+        params = [copy.deepcopy(self.param)]
+
+        n_iter = self.n_iter
+        try:
+            while len(self.param.weights_) < self.n_mix:
+                k = len(self.param.weights_)
+                self._split_mixtures(min(k, self.n_mix - k))
+                if len(self.param.weights_) < self.n_mix:
+                    self.n_iter = n_split_iter
+                else:
+                    self.n_iter = n_iter
+                self.train(jnt, n_jobs=n_jobs, shardsize=shardsize,
+                           warm_start=True)
+                params.append(copy.deepcopy(self.param))
+        finally:
+            self.n_iter = n_iter
+        return params
+
+    def _split_mixtures(self, n_split, perturbation=0.2):
+        """Split mixture components along their principal axes
+        The components with the largest weights are split into two, whose
+        means are shifted by `perturbation` times the standard deviation
+        along the principal axis.
+
+        Parameters
+        ----------
+        n_split : int
+            The number of mixture components to be split
+        perturbation : float, optional
+            Shift of the means in the standard deviation
+            Default set to 0.2
+
+        """
+        weights = self.param.weights_.copy()
+        means = self.param.means_
+        covariances = self.param.covariances_
+
+        idx = np.argsort(weights)[::-1][:n_split]
+        eigval, eigvec = np.linalg.eigh(covariances[idx])
+        offset = (perturbation * np.sqrt(eigval[:, -1])[:, np.newaxis] *
+                  eigvec[:, :, -1])
+
+        weights[idx] /= 2
+        weights = np.r_[weights, weights[idx]]
+        means = np.r_[means, means[idx] - offset]
+        means[idx] += offset
+        covariances = np.r_[covariances, covariances[idx]]
+
+        self.param = self._construct_param(len(weights))
+        self.param.weights_ = weights
+        self.param.means_ = means
+        self.param.covariances_ = covariances
+        if not isinstance(self.param, BlockDiagonalGaussianMixture):
+            self.param.precisions_cholesky_ = compute_precision_cholesky(
+                covariances)
+
+    def train_online(self, jnt, batchsize=10000, blocksize=500, n_epoch=1,
+                     decay=0.6):
+        """Fit GMM parameter by the stepwise online EM algorithm
+        The joint feature vector is read in mini-batches, and the GMM
+        parameter is updated from the sufficient statistics interpolated
+        with a step size of `(k + 2) ** -decay` at the k-th mini-batch.
+        Because only a mini-batch is loaded at once, the memory usage
+        does not depend on the number of frames.
+
+        Parameters
+        ----------
+        jnt : array-like, shape(`T`, `dim`)
+            Joint feature vector of original and target feature vector
+            consisting of static and delta components.
+            Any array supporting slicing such as h5py.Dataset
+            or numpy.memmap is acceptable.
+        batchsize : int, optional
+            The number of frames in a mini-batch
+            Default set to 10000
+        blocksize : int, optional
+            The number of consecutive frames read at once.
+            A mini-batch consists of randomly selected blocks to reduce
+            the correlation between frames of the same utterance.
+            Default set to 500
+        n_epoch : int, optional
+            The number of passes over the joint feature vector
+            Default set to 1
+        decay : float, optional
+            Decay of the step size, which should be in (0.5, 1]
+            Default set to 0.6
+
+        """
+        if not 0.5 < decay <= 1.0:
+            raise ValueError("decay should be in (0.5, 1]")
+
+        T, dim = jnt.shape
+        blocksize = min(blocksize, batchsize)
+        n_block = int(np.ceil(T / blocksize))
+        n_block_per_batch = max(batchsize // blocksize, 1)
+
+        # initialize by frames subsampled over the whole joint feature
+        # vector, whose size is at most `batchsize`
+        step = int(np.ceil(T / batchsize))
+        self.param._initialize_parameters(
+            np.asarray(jnt[::step], dtype=np.float64), self.random_state)
+
+        stats = None
+        k = 0
+        for epoch in range(n_epoch):
+            blocks = self.random_state.permutation(n_block)
+            for s in range(0, n_block, n_block_per_batch):
+                X = np.concatenate(
+                    [jnt[b * blocksize:(b + 1) * blocksize]
+                     for b in np.sort(blocks[s:s + n_block_per_batch])]
+                ).astype(np.float64)
+                _, log_resp = self.param._e_step(X)
+                batch_stats = GMMStatistics(
+                    self.n_mix, dim, covtype=self.covtype).accumulate(
+                        X, np.exp(log_resp)) * (1.0 / len(X))
+
+                if stats is None:
+                    stats = batch_stats
+                else:
+                    eta = (k + 2) ** -decay
+                    stats = stats * (1.0 - eta) + batch_stats * eta
+                self._open_statistics(stats)
+                k += 1
+
+    def _open_statistics(self, stats):
+        """Set GMM parameter estimated from sufficient statistics
+
+        Parameters
+        ----------
+        stats : GMMStatistics
+            Sufficient statistics of the GMM
+
+        """
+        if isinstance(self.param, BlockDiagonalGaussianMixture):
+            self.param._set_parameters(stats.estimate_block_diag_parameters(
+                reg_covar=self.param.reg_covar))
+            return
+
+        (
+            self.param.weights_,
+            self.param.means_,
+            self.param.covariances_,
+        ) = stats.estimate_parameters(reg_covar=self.param.reg_covar)
+        self.param.precisions_cholesky_ = compute_precision_cholesky(
+            self.param.covariances_)
+
+    def estimate_statistics(self, jnt, shardsize=100000):
+        """Estimate sufficient statistics of the current GMM
+        The statistics are kept as `stats`, which can be saved with the
+        GMM and used by `update` later.
+
+        Parameters
+        ----------
+        jnt : array-like, shape(`T`, `dim`)
+            Joint feature vector which the GMM has been fit to
+        shardsize : int, optional
+            The number of frames processed at once
+            Default set to 100000
+
+        Returns
+        -------
+        stats : GMMStatistics
+            Sufficient statistics of the GMM
+
+        """
+        self.stats = self._accumulate_statistics(jnt, shardsize=shardsize)
+        return self.stats
+
+    def update(self, jnt, n_iter=1, shardsize=100000):
+        """Update GMM parameter incrementally by new joint feature vector
+        The statistics of the new joint feature vector are added to `stats`
+        of the data which the GMM has been fit to, so that the GMM is
+        updated without the previous data. The statistics of the previous
+        data are fixed at their responsibilities in `estimate_statistics`.
+
+        Parameters
+        ----------
+        jnt : array-like, shape(`T_new`, `dim`)
+            New joint feature vector
+        n_iter : int, optional
+            The number of EM iterations over the new joint feature vector
+            Default set to 1
+        shardsize : int, optional
+            The number of frames processed at once
+            Default set to 100000
+
+        """
+        if self.stats is None:
+            raise ValueError("Please estimate statistics before update")
+        if n_iter < 1:
+            raise ValueError("n_iter should be greater than or equal to 1")
+
+        for n in range(n_iter):
+            new_stats = self._accumulate_statistics(jnt, shardsize=shardsize)
+            self._open_statistics(self.stats + new_stats)
+        self.stats = self.stats + new_stats
+
+    def adapt(self, jnt, relevance_factor=16.0, params="m", n_iter=1,
+              shardsize=100000):
+        """MAP adaptation of the current GMM to given joint feature vector
+        The current GMM, e.g., a background JD-GMM opened by
+        `open_from_param`, is used as the prior. The parameters of each
+        mixture component are interpolated between the prior and the
+        estimates from `jnt` by `n_m / (n_m + relevance_factor)`, where
+        `n_m` is the occupancy of the component in `jnt`.
+
+        Parameters
+        ----------
+        jnt : array-like, shape(`T`, `dim`)
+            Joint feature vector for adaptation
+        relevance_factor : float, optional
+            Weight of the prior in the number of frames
+            Default set to 16.0
+        params : str, optional
+            Parameters to be adapted, any combination of
+            'w' : weights, 'm' : means, and 'c' : covariances
+            Default set to 'm'
+        n_iter : int, optional
+            The number of EM iterations of MAP estimation
+            Default set to 1
+        shardsize : int, optional
+            The number of frames processed at once
+            Default set to 100000
+
+        """
+        if not params or not set(params) <= set("wmc"):
+            raise ValueError("params should be combination of w, m, and c")
+
+        prior = self.param._get_parameters()
+        prior_stats = self._prior_statistics(relevance_factor)
+        for n in range(n_iter):
+            stats = self._accumulate_statistics(jnt, shardsize=shardsize)
+            self._open_statistics(prior_stats + stats)
+            posterior = self.param._get_parameters()
+
+            # weights interpolated between the prior and the occupancy
+            if "w" in params:
+                alpha = stats.nk / (stats.nk + relevance_factor)
+                weights = (alpha * stats.nk / np.sum(stats.nk) +
+                           (1 - alpha) * prior[0])
+                weights /= np.sum(weights)
+            else:
+                weights = prior[0]
+            means = posterior[1] if "m" in params else prior[1]
+            covariances = posterior[2:] if "c" in params else prior[2:]
+            self.param._set_parameters((weights, means) + tuple(covariances))
+
+    def _accumulate_statistics(self, jnt, shardsize=100000):
+        """Accumulate sufficient statistics of the current GMM
+
+        Parameters
+        ----------
+        jnt : array-like, shape(`T`, `dim`)
+            Joint feature vector
+        shardsize : int, optional
+            The number of frames processed at once
+            Default set to 100000
+
+        Returns
+        -------
+        stats : GMMStatistics
+            Sufficient statistics of the GMM
+
+        """
+        stats = GMMStatistics(
+            len(self.param.weights_), jnt.shape[1], covtype=self.covtype)
+        for s in range(0, len(jnt), shardsize):
+            X = np.asarray(jnt[s:s + shardsize], dtype=np.float64)
+            _, log_resp = self.param._e_step(X)
+            stats.accumulate(X, np.exp(log_resp))
+        return stats
+
+    def _prior_statistics(self, relevance_factor):
+        """Statistics of `relevance_factor` frames from the current GMM
+
+        Parameters
+        ----------
+        relevance_factor : float
+            The number of frames of each mixture component
+
+        Returns
+        -------
+        stats : GMMStatistics
+            Sufficient statistics whose estimates equal to the current GMM
 
         """
-        self.param.fit(jnt)
+        n_mix, dim = self.param.means_.shape
+        means = self.param.means_
+        stats = GMMStatistics(n_mix, dim, covtype=self.covtype)
+        stats.nk = np.full(n_mix, float(relevance_factor))
+        stats.sx = relevance_factor * means
+        if isinstance(self.param, BlockDiagonalGaussianMixture):
+            D = dim // 2
+            stats.sxx = relevance_factor * (self.param.diagcov_ + means ** 2)
+            stats.sxy = relevance_factor * (
+                self.param.xycov_ + means[:, :D] * means[:, D:])
+        else:
+            stats.sxx = relevance_factor * (
+                self.param.covariances_ +
+                np.einsum("mi,mj->mij", means, means))
+        return stats
 
     def estimate_responsibility(self, ref_jnt):
         """E-step for the single-path training
@@ -137,19 +690,53 @@ class GMMConvertor(object):
     """A GMM Convertor
     This class offers the several conversion techniques such as Maximum
     Likelihood Parameter Generation (MLPG) and Mimimum Mean Square Error
-    (MMSE). Note that the conversion is performed while regarding GMM
-    covariance as full-covariance matrix
+    (MMSE). The conversion is performed while regarding GMM covariance as
+    full-covariance matrix or block-diagonal matrix.
 
     Parameters
     ----------
     n_mix : int, optional
         The number of mixture components of the GMM
         Default set to 32.
+    covtype : str, optional
+        The type of covariance matrix of the GMM
+        'full' : full-covariance matrix
+        'block_diag' : block-diagonal matrix, whose blocks are diagonal.
+            The parameters are stored as vectors, and the conversion is
+            performed by elementwise calculation in each dimension.
+        `None` : 'block_diag' if the opened GMM is
+            BlockDiagonalGaussianMixture, otherwise 'full'
+        Default set to `None`
     gmmmode: str, optional
         The type of the GMM for opening
         `None` : Normal JD-GMM
         `diff` : Differential GMM
         `intra` : Intra-speaker GMM
+    chunksize : int, optional
+        The number of frames processed at once in the estimation of the
+        conditional parameter sequence. It bounds the size of temporary
+        arrays to `chunksize` x `dim` x `dim`.
+        Default set to 1024.
+    mmse_threshold : float, optional
+        Threshold of the posterior probability for MMSE-based conversion.
+        The mixture components whose posterior is less than the threshold
+        are skipped in each frame and the remaining posteriors are
+        renormalized.
+        Default set to `None` (i.e., all mixture components are used)
+    solver : str, optional
+        Linear solver for MLPG-based conversion
+        `banded` : banded Cholesky decomposition of W'DW
+        `sparse` : sparse LU decomposition of W'DW (scipy.sparse)
+        `cg` : conjugate gradient without constructing W'DW, whose memory
+            usage is proportional to `T` x `dim` even for full-covariance
+            matrix while the solution is iterative
+        Default set to `banded`
+    dtype : data-type, optional
+        Data type of the conversion. If `np.float32`, the parameters
+        for conversion are stored as float32, and the posterior, the
+        conditional mean, and MLPG are computed in float32. The matrix
+        inversions in opening the GMM are performed in float64.
+        Default set to `np.float64`
 
     Attributes
     ----------
@@ -164,10 +751,33 @@ class GMMConvertor(object):
 
     """
 
-    def __init__(self, n_mix=32, covtype="full", gmmmode=None):
+    def __init__(
+        self,
+        n_mix=32,
+        covtype=None,
+        gmmmode=None,
+        chunksize=1024,
+        mmse_threshold=None,
+        solver="banded",
+        dtype=np.float64,
+    ):
         self.n_mix = n_mix
         self.gmmmode = gmmmode
 
+        if covtype not in [None, "full", "block_diag"]:
+            raise ValueError("Covariance type should be full or block_diag")
+        self.covtype = covtype
+        self.chunksize = chunksize
+        self.mmse_threshold = mmse_threshold
+
+        if solver not in ["banded", "sparse", "cg"]:
+            raise ValueError("MLPG solver should be banded, sparse, or cg")
+        self.solver = solver
+
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            raise ValueError("dtype should be float32 or float64")
+        self.dtype = np.dtype(dtype)
+
     def open_from_param(self, param):
         """Open GMM from GMMTrainer
 
@@ -178,9 +788,85 @@ class GMMConvertor(object):
 
         """
         self.param = param
+        if self.covtype is None:
+            if isinstance(param, BlockDiagonalGaussianMixture):
+                self.covtype = "block_diag"
+            else:
+                self.covtype = "full"
         self._deploy_parameters()
         return
 
+    def open_from_file(self, fpath, mmap=True):
+        """Open compiled conversion model from h5 file
+        The parameters for conversion are read without any matrix inversion.
+
+        Parameters
+        ---------
+        fpath : str
+            Path of h5 file of the compiled conversion model
+        mmap : bool, optional
+            Memory-map the parameters instead of loading them, so that
+            several processes can share the conversion model.
+            Default set to True
+
+        """
+        with HDF5(fpath, mode="r") as h5:
+            version = int(h5.read(ext="version"))
+            if version != COMPILED_MODEL_VERSION:
+                raise ValueError(
+                    "Unsupported version of compiled conversion model: {}".format(
+                        version
+                    )
+                )
+            gmmmode = h5.read(ext="gmmmode")
+            gmmmode = gmmmode.decode() if isinstance(gmmmode, bytes) else str(gmmmode)
+            self.gmmmode = gmmmode if gmmmode != "" else None
+            if "covtype" in h5.h5:
+                covtype = h5.read(ext="covtype")
+                self.covtype = (
+                    covtype.decode() if isinstance(covtype, bytes) else str(covtype)
+                )
+            else:
+                self.covtype = "full"
+
+            self.w = h5.read(ext="weights", mmap=mmap)
+            self.meanX = h5.read(ext="meanX", mmap=mmap)
+            self.meanY = h5.read(ext="meanY", mmap=mmap)
+            self.A = h5.read(ext="A", mmap=mmap)
+            self.b = h5.read(ext="b", mmap=mmap)
+            self.cond_cov_inv = h5.read(ext="cond_cov_inv", mmap=mmap)
+            self.precX_chol = h5.read(ext="precisions_cholesky", mmap=mmap)
+
+        self.param = None
+        self.n_mix = len(self.w)
+        self._open_pX()
+        self._cast_parameters()
+        return
+
+    def export(self, fpath):
+        """Export compiled conversion model into h5 file
+        The compiled conversion model consists of the parameters required
+        for conversion, which are already transformed into `gmmmode`.
+
+        Parameters
+        ---------
+        fpath : str
+            Path of h5 file of the compiled conversion model
+
+        """
+        with HDF5(fpath, mode="w") as h5:
+            h5.save(np.array(COMPILED_MODEL_VERSION), ext="version")
+            h5.save("" if self.gmmmode is None else self.gmmmode, ext="gmmmode")
+            h5.save(self.covtype, ext="covtype")
+            h5.save(self.w, ext="weights")
+            h5.save(self.meanX, ext="meanX")
+            h5.save(self.meanY, ext="meanY")
+            h5.save(self.A, ext="A")
+            h5.save(self.b, ext="b")
+            h5.save(self.cond_cov_inv, ext="cond_cov_inv")
+            h5.save(self.precX_chol, ext="precisions_cholesky")
+        return
+
     def convert(self, data, cvtype="mlpg"):
         """Convert data based on conditional probability densify function
 
@@ -200,11 +886,12 @@ class GMMConvertor(object):
 
         """
         # estimate parameter sequence
-        cseq, wseq, mseq, covseq = self._gmmmap(data)
+        data = data.astype(self.dtype, copy=False)
+        cseq, wseq, mseq = self._gmmmap(data)
 
         if cvtype == "mlpg":
             # maximum likelihood parameter generation
-            odata = self._mlpg(mseq, covseq)
+            odata = self._mlpg(cseq, mseq)
         elif cvtype == "mmse":
             # minimum mean square error based parameter generation
             odata = self._mmse(wseq, data)
@@ -213,45 +900,223 @@ class GMMConvertor(object):
 
         return odata
 
+    def convert_batch(self, datalist, cvtype="mlpg"):
+        """Convert list of data based on conditional probability densify function
+        The posterior and conditional parameter sequences are estimated for
+        all the frames of the given data at once, and MLPG is performed in
+        each data.
+
+        Parameters
+        ----------
+        datalist : list, shape (`num_data`)
+            List of original data ([T, dim]) will be converted
+        cvtype: str, optional
+            Type of conversion technique
+            `mlpg` : maximum likelihood parameter generation
+            `mmse` : minimum mean square error
+
+        Returns
+        -------
+        odatalist : list, shape (`num_data`)
+            List of converted data
+
+        """
+        if cvtype not in ["mlpg", "mmse"]:
+            raise ValueError("please choose conversion mode in `mlpg`, `mmse`")
+
+        # estimate parameter sequence of all the data
+        data = np.concatenate(datalist, axis=0).astype(self.dtype, copy=False)
+        cseq, wseq, mseq = self._gmmmap(data)
+        bounds = np.cumsum([0] + [len(d) for d in datalist])
+
+        if cvtype == "mmse":
+            odata = self._mmse(wseq, data)
+            return [odata[s:e] for s, e in zip(bounds[:-1], bounds[1:])]
+
+        odatalist = []
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            odatalist.append(self._mlpg(cseq[s:e], mseq[s:e]))
+        return odatalist
+
+    def convert_chunked(self, data, cvtype="mlpg", chunklen=2000, overlap=50, n_jobs=1):
+        """Convert long data in overlapping chunks
+        The data is split into chunks of `chunklen` frames, and each chunk is
+        converted with `overlap` frames of context on both sides, which are
+        discarded after conversion. The peak memory depends on `chunklen`
+        instead of the length of data, and the chunks can be converted in
+        parallel.
+
+        MMSE-based conversion is identical to `convert`. The deviation of
+        MLPG-based conversion from `convert` decays exponentially with
+        `overlap`. In our measurements using 16-mixture GMMs of 48-dimensional
+        static and delta features, the maximum absolute deviation with
+        `overlap` = 50 was below 1e-5 for full-covariance and 1e-15 for
+        block-diagonal GMMs, and that with `overlap` = 100 was below 1e-9.
+
+        Parameters
+        ----------
+        data : array, shape(`T`, `dim`)
+            Original data will be converted
+        cvtype: str, optional
+            Type of conversion technique
+            `mlpg` : maximum likelihood parameter generation
+            `mmse` : minimum mean square error
+        chunklen : int, optional
+            The number of frames of each chunk
+            Default set to 2000.
+        overlap : int, optional
+            The number of context frames on each side of chunk
+            Default set to 50.
+        n_jobs : int, optional
+            The number of processes to convert chunks
+            Default set to 1.
+
+        Returns
+        -------
+        odata : array, shape(`T`, `dim // 2`)
+            Converted data
+
+        """
+        if cvtype not in ["mlpg", "mmse"]:
+            raise ValueError("please choose conversion mode in `mlpg`, `mmse`")
+
+        T = len(data)
+        chunks = []
+        for s in range(0, T, chunklen):
+            start, end = max(0, s - overlap), min(T, s + chunklen + overlap)
+            chunks.append((data[start:end], cvtype, s - start, min(chunklen, T - s)))
+
+        if n_jobs == 1:
+            odatalist = [_convert(self, *chunk) for chunk in chunks]
+        else:
+            with Pool(n_jobs, initializer=_init_convert_worker, initargs=(self,)) as p:
+                odatalist = p.map(_convert_chunk, chunks)
+        return np.concatenate(odatalist, axis=0)
+
     def _gmmmap(self, sddata):
         # parameter for sequencial data
+        sddata = sddata.astype(self.dtype, copy=False)
         T, sddim = sddata.shape
 
-        # estimate posterior sequence
-        wseq = self.pX.predict_proba(sddata)
+        # estimate posterior and mixture sequence
+        _, wseq, cseq = self.estimate_posterior(sddata)
+
+        # conditional mean vector sequence
+        # (i.e., meanY[m] + A[m] @ (x_t - meanX[m]) for m = cseq[t])
+        if self.covtype == "block_diag":
+            # A[m] is diagonal and stored as vector
+            mseq = self.meanY[cseq] + self.A[cseq] * (sddata - self.meanX[cseq])
+            return cseq, wseq, mseq
+
+        mseq = np.empty((T, sddim), dtype=self.dtype)
+        for s in range(0, T, self.chunksize):
+            c = cseq[s : s + self.chunksize]
+            mseq[s : s + self.chunksize] = self.meanY[c] + np.einsum(
+                "tij,tj->ti", self.A[c], sddata[s : s + self.chunksize] - self.meanX[c]
+            )
 
-        # estimate mixture sequence
-        cseq = np.argmax(wseq, axis=1)
+        # conditional covariance sequence is given by cseq and cond_cov_inv
+        return cseq, wseq, mseq
 
-        mseq = np.zeros((T, sddim))
-        covseq = np.zeros((T, sddim, sddim))
-        for t in range(T):
-            # read maximum likelihood mixture component in frame t
-            m = cseq[t]
+    def estimate_posterior(self, sddata):
+        """Estimate posterior probability of mixture components given data
 
-            # conditional mean vector sequence
-            mseq[t] = self.meanY[m] + self.A[m] @ (sddata[t] - self.meanX[m])
+        Parameters
+        ----------
+        sddata : array, shape(`T`, `dim`)
+            Original static and delta feature vectors
+            The posterior is computed as float32 if `sddata` is float32.
 
-            # conditional covariance sequence
-            covseq[t] = self.cond_cov_inv[m]
+        Returns
+        -------
+        log_wseq : array, shape(`T`, `n_mix`)
+            Log-posterior sequence
+        wseq : array, shape(`T`, `n_mix`)
+            Posterior sequence
+        cseq : array, shape(`T`)
+            Maximum likelihood mixture sequence
+
+        """
+        T, sddim = sddata.shape
+        dtype = np.float32 if sddata.dtype == np.float32 else np.float64
+        weight = self._pX_weight.astype(dtype, copy=False)
+        bias = self._pX_bias.astype(dtype, copy=False)
+        log_const = self._pX_const.astype(dtype, copy=False)
+
+        log_wseq = np.empty((T, self.n_mix), dtype=dtype)
+        for s in range(0, T, self.chunksize):
+            x = sddata[s : s + self.chunksize].astype(dtype, copy=False)
+            if self.covtype == "block_diag":
+                # Mahalanobis distance of diagonal covariance, i.e.,
+                # x'Px - 2 x'P mu + mu'P mu for P = diag(precX_chol^2)
+                log_prob = log_const - 0.5 * ((x * x) @ weight - 2 * x @ bias)
+            else:
+                # Mahalanobis distance of all the mixtures by single GEMM
+                y = x @ weight
+                y -= bias
+                log_prob = log_const - 0.5 * np.sum(
+                    (y * y).reshape(-1, self.n_mix, sddim), axis=2
+                )
+
+            # normalize in log domain
+            log_wseq[s : s + self.chunksize] = log_prob - scipy.special.logsumexp(
+                log_prob, axis=1, keepdims=True
+            )
 
-        return cseq, wseq, mseq, covseq
+        return log_wseq, np.exp(log_wseq), np.argmax(log_wseq, axis=1)
 
     def _mmse(self, wseq, sddata):
         # parameter for sequencial data
         T, sddim = sddata.shape
 
-        odata = np.zeros((T, sddim))
-        for t in range(T):
-            for m in range(self.n_mix):
-                odata[t] += wseq[t, m] * (
-                    self.meanY[m] + self.A[m] @ (sddata[t] - self.meanX[m])
-                )
+        # only static component of conditional mean is required
+        A = self.A[:, : sddim // 2]
+        b = self.b[:, : sddim // 2]
+
+        if self.covtype == "block_diag":
+            if self.mmse_threshold is not None:
+                wseq = self._prune_posterior(wseq)
+            # A[m] is diagonal and stored as vector
+            return wseq @ b + sddata[:, : sddim // 2] * (wseq @ A)
+
+        if self.mmse_threshold is not None:
+            # skip the mixtures with negligible posterior in each frame
+            wseq = self._prune_posterior(wseq)
+
+            odata = wseq @ b
+            for m in np.nonzero(np.any(wseq, axis=0))[0]:
+                idx = np.nonzero(wseq[:, m])[0]
+                odata[idx] += wseq[idx, m, np.newaxis] * (sddata[idx] @ A[m].T)
+            return odata
+
+        odata = np.empty((T, sddim // 2), dtype=self.dtype)
+        for s in range(0, T, self.chunksize):
+            # conditional mean vector of all the mixtures, shape (t, n_mix, dim)
+            Ax = (sddata[s : s + self.chunksize] @ A.reshape(-1, sddim).T).reshape(
+                -1, self.n_mix, sddim // 2
+            )
 
-        # retern static and throw away delta component
-        return odata[:, : sddim // 2]
+            # weighted sum of the conditional mean vectors
+            w = wseq[s : s + self.chunksize]
+            odata[s : s + self.chunksize] = w @ b + np.einsum("tm,tmi->ti", w, Ax)
+
+        # retern static component
+        return odata
+
+    def _prune_posterior(self, wseq):
+        # remove mixtures whose posterior is less than threshold while keeping
+        # the maximum likelihood mixture, and renormalize the posterior
+        keep = wseq >= self.mmse_threshold
+        keep[np.arange(len(wseq)), np.argmax(wseq, axis=1)] = True
+        wseq = np.where(keep, wseq, 0.0)
+        return wseq / np.sum(wseq, axis=1, keepdims=True)
+
+    def _mlpg(self, cseq, mseq):
+        if self.solver == "banded":
+            return mlpg(mseq, cseq, self.cond_cov_inv, chunksize=self.chunksize)
+        elif self.solver == "cg":
+            return mlpg_cg(mseq, cseq, self.cond_cov_inv)
 
-    def _mlpg(self, mseq, covseq):
         # parameter for sequencial data
         T, sddim = mseq.shape
 
@@ -259,7 +1124,7 @@ class GMMConvertor(object):
         W = construct_static_and_delta_matrix(T, sddim // 2)
 
         # prepare D
-        D = get_diagonal_precision_matrix(T, sddim, covseq)
+        D = get_diagonal_precision_matrix(T, sddim, self.cond_cov_inv[cseq])
 
         # calculate W'D
         WD = W.T @ D
@@ -282,16 +1147,31 @@ class GMMConvertor(object):
         # read JD-GMM parameters from self.param
         self.w = self.param.weights_
         self.jmean = self.param.means_
-        self.jcov = self.param.covariances_
 
         # devide GMM parameters into source and target parameters
         sddim = self.jmean.shape[1] // 2
         self.meanX = self.jmean[:, 0:sddim]
         self.meanY = self.jmean[:, sddim:]
-        self.covXX = self.jcov[:, :sddim, :sddim]
-        self.covXY = self.jcov[:, :sddim, sddim:]
-        self.covYX = self.jcov[:, sddim:, :sddim]
-        self.covYY = self.jcov[:, sddim:, sddim:]
+        if self.covtype == "block_diag" and isinstance(
+            self.param, BlockDiagonalGaussianMixture
+        ):
+            # read blocks without constructing full-covariance matrices
+            self.covXX = self.param.diagcov_[:, :sddim].copy()
+            self.covYY = self.param.diagcov_[:, sddim:].copy()
+            self.covXY = self.param.xycov_.copy()
+            self.covYX = self.param.xycov_.copy()
+        else:
+            self.jcov = self.param.covariances_
+            self.covXX = self.jcov[:, :sddim, :sddim]
+            self.covXY = self.jcov[:, :sddim, sddim:]
+            self.covYX = self.jcov[:, sddim:, :sddim]
+            self.covYY = self.jcov[:, sddim:, sddim:]
+            if self.covtype == "block_diag":
+                # keep only diagonal elements of each block
+                self.covXX, self.covXY, self.covYX, self.covYY = [
+                    np.diagonal(cov, axis1=1, axis2=2).copy()
+                    for cov in [self.covXX, self.covXY, self.covYX, self.covYY]
+                ]
 
         # change model paramter of GMM into that of gmmmode
         if self.gmmmode is None:
@@ -306,10 +1186,26 @@ class GMMConvertor(object):
         # estimate parameters for conversion
         self._set_Ab()
         self._set_pX()
+        self._cast_parameters()
 
         return
 
+    def _cast_parameters(self):
+        # parameters used in conversion are stored as self.dtype
+        for name in ["meanX", "meanY", "A", "b", "cond_cov_inv",
+                     "_pX_weight", "_pX_bias", "_pX_const"]:
+            setattr(self, name,
+                    getattr(self, name).astype(self.dtype, copy=False))
+
     def _set_Ab(self):
+        if self.covtype == "block_diag":
+            # all the parameters are elementwise in each dimension
+            self.covXXinv = 1.0 / self.covXX
+            self.A = self.covYX * self.covXXinv
+            self.b = self.meanY - self.A * self.meanX
+            self.cond_cov_inv = 1.0 / (self.covYY - self.A * self.covXY)
+            return
+
         # calculate A and b from self.jmean, self.jcov
         sddim = self.jmean.shape[1] // 2
 
@@ -338,16 +1234,47 @@ class GMMConvertor(object):
         return
 
     def _set_pX(self):
+        # Cholesky factors of precision matrix of X to estimate porsterior
+        if self.covtype == "block_diag":
+            self.precX_chol = 1.0 / np.sqrt(self.covXX)
+        else:
+            self.precX_chol = compute_precision_cholesky(self.covXX)
+        self._open_pX()
+        return
+
+    def _open_pX(self):
         # probability density function of X
-        self.pX = sklearn.mixture.GaussianMixture(
-            n_components=self.n_mix, covariance_type="full"
+        # i.e., log N(x; mu, S) = log|L| - 0.5 * (D log(2pi) + |(x - mu)' L|^2)
+        # for precision Cholesky factor L (S^-1 = L L')
+        if self.covtype == "block_diag":
+            sddim = self.precX_chol.shape[1]
+            precX = self.precX_chol ** 2
+            self.log_det_precX_chol = np.sum(np.log(self.precX_chol), axis=1)
+            self._pX_weight = precX.T
+            self._pX_bias = (self.meanX * precX).T
+            self._pX_const = (
+                np.log(self.w)
+                + self.log_det_precX_chol
+                - 0.5 * sddim * np.log(2 * np.pi)
+                - 0.5 * np.sum(self.meanX ** 2 * precX, axis=1)
+            )
+            return
+
+        n_mix, sddim, _ = self.precX_chol.shape
+        self.log_det_precX_chol = np.sum(
+            np.log(np.diagonal(self.precX_chol, axis1=1, axis2=2)), axis=1
         )
-        self.pX.weights_ = self.w
-        self.pX.means_ = self.meanX
-        self.pX.covariances_ = self.covXX
 
-        # following function is required to estimate porsterior
-        self.pX.precisions_cholesky_ = _compute_precision_cholesky(self.covXX, "full")
+        # stack parameters of all the mixtures for single GEMM
+        self._pX_weight = self.precX_chol.transpose(1, 0, 2).reshape(
+            sddim, n_mix * sddim
+        )
+        self._pX_bias = np.einsum("mi,mij->mj", self.meanX, self.precX_chol).reshape(
+            n_mix * sddim
+        )
+        self._pX_const = (
+            np.log(self.w) + self.log_det_precX_chol - 0.5 * sddim * np.log(2 * np.pi)
+        )
         return
 
     def _transform_gmm_into_diffgmm(self):
@@ -356,18 +1283,169 @@ class GMMConvertor(object):
         self.covXX = self.covXX
         self.covYY = self.covXX + self.covYY - self.covXY - self.covYX
         self.covXY = self.covXY - self.covXX
-        self.covYX = self.covXY.transpose(0, 2, 1)
+        if self.covtype == "block_diag":
+            self.covYX = self.covXY
+        else:
+            self.covYX = self.covXY.transpose(0, 2, 1)
         return
 
     def _transform_gmm_into_intragmm(self):
         self.meanX = self.meanX
         self.meanY = self.meanX
         self.covXX = self.covXX
-        self.covXY = self.covXY @ np.linalg.solve(self.covYY, self.covYX)
+        if self.covtype == "block_diag":
+            self.covXY = self.covXY * self.covYX / self.covYY
+        else:
+            self.covXY = self.covXY @ np.linalg.solve(self.covYY, self.covYX)
         self.covYX = self.covXY
         self.covYY = self.covXX
         return
 
 
+class GMMStreamConvertor(object):
+    """A streaming GMM Convertor
+    This class offers the low-latency MLPG-based conversion, which accepts
+    static and delta feature vectors incrementally and emits the converted
+    static feature vectors once `lookahead` future frames are received.
+
+    Parameters
+    ----------
+    convertor : GMMConvertor
+        GMMConvertor class which has been already opened
+    lookahead : int, optional
+        The number of future frames used to convert each frame
+        Default set to 10.
+
+    """
+
+    def __init__(self, convertor, lookahead=10):
+        self.convertor = convertor
+        self.lookahead = lookahead
+        self.mlpg = StreamingMLPG(convertor.cond_cov_inv, lookahead=lookahead)
+
+    def push(self, data):
+        """Convert incoming frames
+
+        Parameters
+        ----------
+        data : array, shape(`T`, `dim`)
+            Original static and delta feature vectors of incoming frames
+
+        Returns
+        -------
+        odata : array, shape(`T_emit`, `dim // 2`)
+            Converted static feature vectors which are final
+
+        """
+        cseq, _, mseq = self.convertor._gmmmap(data)
+        return self.mlpg.push(mseq, cseq)
+
+    def flush(self):
+        """Convert all the remaining frames at the end of input
+
+        Returns
+        -------
+        odata : array, shape(`T_emit`, `dim // 2`)
+            Converted static feature vectors of the remaining frames
+
+        """
+        return self.mlpg.flush()
+
+
+def _init_em_worker(jnt, param, covtype, sample_weight=None, dtype=np.float64):
+    # share joint feature vector and GMM parameter in the process
+    global _worker_em
+    _worker_em = (jnt, copy.deepcopy(param), covtype, sample_weight, dtype)
+
+
+def _accumulate_shard(args):
+    # accumulate by joint feature vector and GMM parameter shared in the
+    # process
+    return _accumulate(*_worker_em, args)
+
+
+def _accumulate(jnt, param, covtype, sample_weight, dtype, args):
+    # E-step and accumulation of sufficient statistics in the shard
+    gmmparam, start, end = args
+    param._set_parameters(tuple(p.astype(dtype, copy=False) for p in gmmparam))
+
+    X = np.asarray(jnt[start:end], dtype=dtype)
+    stats = GMMStatistics(len(param.weights_), X.shape[1], covtype=covtype)
+    if sample_weight is None:
+        log_prob_norm, log_resp = param._e_step(X)
+        stats.accumulate(X, np.exp(log_resp))
+        return stats, log_prob_norm * len(X)
+
+    weight = sample_weight[start:end]
+    log_prob_norm, log_resp = param._estimate_log_prob_resp(X)
+    stats.accumulate(X, np.exp(log_resp) * weight[:, np.newaxis])
+    return stats, np.dot(weight, log_prob_norm)
+
+
+def _init_restart_worker(trainer, jnt, shardsize, sample_weight=None):
+    # share trainer and joint feature vector in the process
+    global _worker_restart
+    _worker_restart = (trainer, jnt, shardsize, sample_weight)
+
+
+def _train_restart(seed):
+    # train GMM by trainer and joint feature vector shared in the process
+    return _restart(*_worker_restart, seed)
+
+
+def _restart(trainer, jnt, shardsize, sample_weight, seed):
+    # train GMM from the seed in a single process
+    trainer = copy.copy(trainer)
+    trainer.n_init = 1
+    trainer.random_state = np.random.RandomState(seed)
+    trainer.param = trainer._construct_param(trainer.n_mix)
+    trainer.train(jnt, shardsize=shardsize, sample_weight=sample_weight)
+    return trainer.param.lower_bound_, trainer.param
+
+
+def _init_convert_worker(convertor):
+    # share GMMConvertor in the process
+    global _worker_convertor
+    _worker_convertor = convertor
+
+
+def _convert_chunk(args):
+    # convert chunk by GMMConvertor shared in the process
+    return _convert(_worker_convertor, *args)
+
+
+def _convert(convertor, data, cvtype, offset, length):
+    # convert chunk and discard its context
+    odata = convertor.convert(data, cvtype=cvtype)
+    return odata[offset : offset + length]
+
+
+def compute_precision_cholesky(covariances):
+    """Compute Cholesky factors of precision matrices
+
+    Parameters
+    ----------
+    covariances : array, shape (`n_mix`, `dim`, `dim`)
+        Covariance matrices
+
+    Returns
+    -------
+    precisions_chol : array, shape (`n_mix`, `dim`, `dim`)
+        Upper triangular Cholesky factors of the precision matrices
+
+    """
+    n_mix, dim, _ = covariances.shape
+    precisions_chol = np.empty((n_mix, dim, dim))
+    for m in range(n_mix):
+        cov_chol = scipy.linalg.cholesky(covariances[m], lower=True)
+        precisions_chol[m] = scipy.linalg.solve_triangular(
+            cov_chol, np.eye(dim), lower=True
+        ).T
+    return precisions_chol
+
+
 def get_diagonal_precision_matrix(T, D, covseq):
+    if covseq.ndim == 2:
+        # diagonal precision matrix stored as vector
+        return scipy.sparse.diags(covseq.ravel(), format="csr")
     return scipy.sparse.block_diag(covseq, format="csr")
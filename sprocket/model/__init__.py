@@ -1,4 +1,4 @@
-from .GMM import GMMTrainer, GMMConvertor
+from .GMM import GMMTrainer, GMMConvertor, GMMStreamConvertor
 from .f0statistics import F0statistics
 from .gv import GV
 from .ms import MS
@@ -1,14 +1,22 @@
 # -*- coding: utf-8 -*-
 
+import os
+import time
+
 import numpy as np
 import sklearn.mixture
-from sklearn.mixture._gaussian_mixture import _compute_precision_cholesky
+
+from sprocket.util.hdf5 import HDF5
 
 
 class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
     """GMM with block diagonal covariance matrix
     This class offers the training of GMM with block diagonal covariance matrix.
-    Note that the parent class (GaussianMixture) is trained as full-covariance matrix
+    The covariance matrix is kept as 2x2 blocks of the source variance,
+    the target variance, and the cross covariance in each dimension, and
+    the likelihood is calculated in closed form of the blocks.
+    Full-covariance matrices of the parent class (GaussianMixture) are
+    available as `covariances_` and `precisions_cholesky_`.
 
     Parameters
     ----------
@@ -20,16 +28,25 @@ class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
         Default set to 100.
     floor : str, optional
         Flooring of covariance matrix
+    tol : float, optional
+        The convergence threshold of the change of the lower bound
+        Default set to 1e-3.
 
     Attributes
     ----------
-    param :
-        Sklean-based model parameters of the GMM
+    diagcov_ : array, shape (`n_mix`, `n_features`)
+        Diagonal elements of the covariance matrices
+    xycov_ : array, shape (`n_mix`, `n_features // 2`)
+        Cross covariance between source and target in each dimension
     """
 
-    def __init__(self, n_mix=32, n_iter=100, floor=1e-6):
+    def __init__(self, n_mix=32, n_iter=100, floor=1e-6, tol=1e-3):
         super().__init__(
-            n_components=n_mix, reg_covar=floor, max_iter=n_iter, covariance_type="full"
+            n_components=n_mix,
+            reg_covar=floor,
+            max_iter=n_iter,
+            covariance_type="full",
+            tol=tol,
         )
         self.n_mix = n_mix
         self.n_iter = n_iter
@@ -38,53 +55,309 @@ class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
         # seed for random in sklearn
         self.random_state = np.random.mtrand._rand
 
-    def fit(self, X):
+    def fit(self, X, callback=None, checkpoint=None, checkpoint_interval=10,
+            sample_weight=None):
         """Fit GMM parameters to X
+        The EM algorithm stops when the change of the lower bound is less
+        than `tol` or the number of iteration reaches `n_iter`.
+        If `warm_start` is `True` and the parameters have been fitted,
+        the EM algorithm starts from the current parameters.
 
         Parameters
         ----------
         X : array-like, shape (n_samples, n_features)
+        callback : function, optional
+            Function called with a dict after each iteration, which has
+            `iteration`, `lower_bound`, `change`, `e_step_time`,
+            and `m_step_time` [sec]
+            Default set to `None`
+        checkpoint : str, optional
+            Path of h5 file to save the parameters during the training,
+            which is saved every `checkpoint_interval` iterations and at
+            the end of the training.
+            If the file exists, the training resumes from the parameters,
+            the iteration, and the convergence saved in the file, which
+            have to be of the GMM of `n_mix` components for the dimension
+            of `X`. The training saved after convergence is not continued.
+            Default set to `None`
+        checkpoint_interval : int, optional
+            The number of iterations between checkpoints
+            Default set to 10
+        sample_weight : array-like, shape (n_samples,), optional
+            Weight of each sample, e.g., weights of coreset.
+            Note that the initialization does not consider the weights.
+            Default set to `None`
 
         """
-        # initialize
-        self._initialize_parameters(X, self.random_state)
-        lower_bound = -np.infty
-
-        for n in range(self.n_iter):
+        if checkpoint is not None and os.path.exists(checkpoint):
+            start, lower_bound, converged = self._load_checkpoint(
+                checkpoint, X.shape[1])
+            self.lower_bound_ = lower_bound
+        elif self.warm_start and hasattr(self, "converged_"):
+            start, lower_bound, converged = 0, -np.inf, False
+        else:
+            # initialize
+            self._initialize_parameters(X, self.random_state)
+            start, lower_bound, converged = 0, -np.inf, False
+
+        self.converged_ = converged
+        self.n_iter_ = start
+        for n in range(start, start if converged else self.n_iter):
             # E-step
-            log_prob_norm, log_resp = self._e_step(X)
+            stime = time.perf_counter()
+            if sample_weight is None:
+                log_prob_norm, log_resp = self._e_step(X)
+            else:
+                log_prob, log_resp = self._estimate_log_prob_resp(X)
+                log_prob_norm = np.average(log_prob, weights=sample_weight)
+            e_step_time = time.perf_counter() - stime
 
             # M-step
-            self._m_step(X, log_resp)
+            stime = time.perf_counter()
+            self._m_step(X, log_resp, sample_weight=sample_weight)
+            m_step_time = time.perf_counter() - stime
 
             # check convergence
             back_lower_bound = lower_bound
             lower_bound = self._compute_lower_bound(log_resp, log_prob_norm)
+            change = lower_bound - back_lower_bound
+            self.n_iter_ = n + 1
+            self.lower_bound_ = lower_bound
+            if callback is not None:
+                callback({
+                    "iteration": n + 1,
+                    "lower_bound": lower_bound,
+                    "change": change,
+                    "e_step_time": e_step_time,
+                    "m_step_time": m_step_time,
+                })
+
+            if abs(change) < self.tol:
+                self.converged_ = True
+            if checkpoint is not None and (
+                self.converged_
+                or (n + 1) % checkpoint_interval == 0
+                or n + 1 == self.n_iter
+            ):
+                self._save_checkpoint(checkpoint)
+            if self.converged_:
+                break
+        return self
+
+    def _save_checkpoint(self, fpath):
+        """Save parameters and state of training into h5 file
 
-    def _m_step(self, X, log_resp):
-        """M step.
+        Parameters
+        ----------
+        fpath : str
+            Path of h5 file
+
+        """
+        # write into temporary file and replace it to keep the checkpoint
+        # consistent even if the training is interrupted while writing
+        tmppath = fpath + ".tmp"
+        h5 = HDF5(tmppath, mode="w")
+        h5.save(self.weights_, ext="weights")
+        h5.save(self.means_, ext="means")
+        h5.save(self.diagcov_, ext="diagcov")
+        h5.save(self.xycov_, ext="xycov")
+        h5.save(self.n_iter_, ext="n_iter")
+        h5.save(self.lower_bound_, ext="lower_bound")
+        h5.save(self.converged_, ext="converged")
+        h5.close()
+        os.replace(tmppath, fpath)
+
+    def _load_checkpoint(self, fpath, n_features):
+        """Load parameters and state of training from h5 file
+
+        Parameters
+        ----------
+        fpath : str
+            Path of h5 file
+        n_features : int
+            The number of features of the data to be fitted
+
+        Returns
+        -------
+        n_iter : int
+            The number of iterations already performed
+        lower_bound : float
+            Lower bound at the last iteration
+        converged : bool
+            Whether the training has converged
+
+        Raises
+        ------
+        ValueError
+            If the parameters in the file do not match `n_mix` and
+            `n_features`
+
+        """
+        with HDF5(fpath, mode="r") as h5:
+            params = {"weights": (self.n_mix,),
+                      "means": (self.n_mix, n_features)}
+            if "diagcov" in h5.h5:
+                params["diagcov"] = (self.n_mix, n_features)
+                params["xycov"] = (self.n_mix, n_features // 2)
+            else:
+                # checkpoint saved with full-covariance matrices
+                params["covariances"] = (self.n_mix, n_features, n_features)
+            for ext, shape in params.items():
+                if ext not in h5.h5 or h5.h5[ext].shape != shape:
+                    raise ValueError(
+                        "Checkpoint {} does not match GMM of {} components "
+                        "for {}-dimensional data: {} should be of shape "
+                        "{}".format(fpath, self.n_mix, n_features, ext,
+                                    shape))
+            params = {ext: h5.read(ext=ext) for ext in params}
+            n_iter = int(h5.read(ext="n_iter"))
+            lower_bound = float(h5.read(ext="lower_bound"))
+            # checkpoint saved before the convergence was recorded
+            converged = ("converged" in h5.h5
+                         and bool(h5.read(ext="converged")))
+
+        self.weights_ = params["weights"]
+        self.means_ = params["means"]
+        if "diagcov" in params:
+            self.diagcov_ = params["diagcov"]
+            self.xycov_ = params["xycov"]
+        else:
+            self.covariances_ = params["covariances"]
+        return n_iter, lower_bound, converged
+
+    def _initialize(self, X, resp):
+        """Initialization of the parameters from responsibilities
 
         Parameters
         ----------
         X : array-like, shape (n_samples, n_features)
 
-        log_resp : array-like, shape (n_samples, n_components)
-            Logarithm of the posterior probabilities (or responsibilities) of
-            the point of each sample in X.
+        resp : array-like, shape (n_samples, n_components)
+            The responsibilities for each data sample in X.
         """
-        n_samples, _ = X.shape
         (
             self.weights_,
             self.means_,
-            self.covariances_,
+            self.diagcov_,
+            self.xycov_,
         ) = self._estimate_gaussian_parameters(
-            X, np.exp(log_resp), self.reg_covar, self.covariance_type
+            X, resp, self.reg_covar, self.covariance_type
         )
-        self.weights_ /= n_samples
+        self.weights_ /= np.sum(self.weights_)
+
+    def _m_step(self, X, log_resp, sample_weight=None):
+        """M step.
 
-        self.precisions_cholesky_ = _compute_precision_cholesky(
-            self.covariances_, self.covariance_type
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+
+        log_resp : array-like, shape (n_samples, n_components)
+            Logarithm of the posterior probabilities (or responsibilities) of
+            the point of each sample in X.
+
+        sample_weight : array-like, shape (n_samples,), optional
+            Weight of each sample
+        """
+        resp = np.exp(log_resp)
+        if sample_weight is not None:
+            resp *= sample_weight[:, np.newaxis]
+        self._initialize(X, resp)
+
+    def _estimate_log_prob(self, X):
+        """Estimate the log Gaussian probability in closed form of blocks
+
+        Parameters
+        ----------
+        X : array-like, shape (n_samples, n_features)
+
+        Returns
+        -------
+        log_prob : array, shape (n_samples, n_components)
+        """
+        n_samples, n_features = X.shape
+        D = n_features // 2
+        x, y = X[:, :D], X[:, D:]
+        xmeans, ymeans = self.means_[:, :D], self.means_[:, D:]
+
+        # elements of the inverse of 2x2 block [[xx, xy], [xy, yy]]
+        xxcov, yycov = self.diagcov_[:, :D], self.diagcov_[:, D:]
+        det = xxcov * yycov - self.xycov_ ** 2
+        xxprec, yyprec, xyprec = yycov / det, xxcov / det, -self.xycov_ / det
+
+        # expand quadratic form into products of data and parameters
+        quad = (
+            np.dot(x ** 2, xxprec.T)
+            + np.dot(y ** 2, yyprec.T)
+            + 2 * np.dot(x * y, xyprec.T)
+            - 2 * np.dot(x, (xxprec * xmeans + xyprec * ymeans).T)
+            - 2 * np.dot(y, (yyprec * ymeans + xyprec * xmeans).T)
+            + np.sum(
+                xxprec * xmeans ** 2
+                + yyprec * ymeans ** 2
+                + 2 * xyprec * xmeans * ymeans,
+                axis=1,
+            )
         )
+        log_det = np.sum(np.log(det), axis=1)
+        return -0.5 * (n_features * np.log(2 * np.pi) + log_det + quad)
+
+    def __setstate__(self, state):
+        # models pickled before the parameters were kept as 2x2 blocks
+        # have full-covariance matrices and their precision factors, which
+        # are hidden by the properties
+        state = dict(state)
+        covariances = state.pop("covariances_", None)
+        state.pop("precisions_cholesky_", None)
+        super().__setstate__(state)
+        if covariances is not None and "diagcov_" not in state:
+            self.covariances_ = covariances
+
+    def _get_parameters(self):
+        return (self.weights_, self.means_, self.diagcov_, self.xycov_)
+
+    def _set_parameters(self, params):
+        (self.weights_, self.means_, self.diagcov_, self.xycov_) = params
+
+    def _n_parameters(self):
+        """Return the number of free parameters in the model."""
+        _, n_features = self.means_.shape
+        return int(self.n_mix * (2.5 * n_features) + self.n_mix - 1)
+
+    @property
+    def covariances_(self):
+        """Full-covariance matrices, shape (n_mix, n_features, n_features)"""
+        return self._block_diag_to_full(self.diagcov_, self.xycov_)
+
+    @covariances_.setter
+    def covariances_(self, covariances):
+        n_features = covariances.shape[1]
+        D = n_features // 2
+        self.diagcov_ = np.diagonal(covariances, axis1=1, axis2=2).copy()
+        self.xycov_ = np.diagonal(covariances[:, :D, D:], axis1=1, axis2=2).copy()
+
+    @property
+    def precisions_cholesky_(self):
+        """Cholesky factors of full-precision matrices
+        The upper triangular factors are calculated in closed form of
+        the 2x2 blocks, shape (n_mix, n_features, n_features)
+        """
+        n_components, n_features = self.diagcov_.shape
+        D = n_features // 2
+        xxcov, yycov = self.diagcov_[:, :D], self.diagcov_[:, D:]
+
+        # lower triangular Cholesky factor of covariance
+        l11 = np.sqrt(xxcov)
+        l21 = self.xycov_ / l11
+        l22 = np.sqrt(yycov - l21 ** 2)
+
+        # transpose of the inverse of the factor
+        precisions_chol = np.zeros((n_components, n_features, n_features))
+        xidx, yidx = np.arange(D), np.arange(D, n_features)
+        precisions_chol[:, xidx, xidx] = 1.0 / l11
+        precisions_chol[:, xidx, yidx] = -l21 / (l11 * l22)
+        precisions_chol[:, yidx, yidx] = 1.0 / l22
+        return precisions_chol
 
     def _estimate_gaussian_parameters(self, X, resp, reg_covar, covariance_type):
         """Estimate the Gaussian distribution parameters.
@@ -111,9 +384,11 @@ class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
         means : array-like, shape (n_components, n_features)
             The centers of the current components.
 
-        covariances : array-like (n_components, n_features, n_features)
-            The covariance matrix of the current components.
-            The shape depends of the covariance_type.
+        diagcov : array-like, shape (n_components, n_features)
+            Diagonal covariance of the current components.
+
+        xycov : array-like, shape (n_components, n_features // 2)
+            Variance-covariance of the current components.
         """
         # estimate weight and mean
         nk = resp.sum(axis=0) + 10 * np.finfo(resp.dtype).eps
@@ -130,9 +405,7 @@ class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
             means[:, : n_features // 2],
             means[:, n_features // 2 :],
         )
-        # block_diag to full
-        covariances = self._block_diag_to_full(diagcov, xycov)
-        return nk, means, covariances
+        return nk, means, diagcov, xycov
 
     def _block_diag_to_full(self, diagcov, xycov):
         """Transform diagonal covariance to full covariance
@@ -151,11 +424,12 @@ class BlockDiagonalGaussianMixture(sklearn.mixture.GaussianMixture):
             Full covariance consiting of xxcov, xycov, yxcov, yycov
         """
         n_components, n_features = diagcov.shape
-        covariances = np.empty((n_components, n_features, n_features))
-        for m in range(n_components):
-            covariances[m] = np.diag(diagcov[m])
-            covariances[m, n_features // 2 :, : n_features // 2] = np.diag(xycov[m])
-            covariances[m, : n_features // 2, n_features // 2 :] = np.diag(xycov[m])
+        D = n_features // 2
+        xidx, yidx = np.arange(D), np.arange(D, n_features)
+        covariances = np.zeros((n_components, n_features, n_features))
+        covariances[:, np.arange(n_features), np.arange(n_features)] = diagcov
+        covariances[:, yidx, xidx] = xycov
+        covariances[:, xidx, yidx] = xycov
         return covariances
 
     def _calculate_diag_covariances(self, resp, nk, x, y, xmeans, ymeans):
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+from sprocket.util.hdf5 import HDF5
+
+
+class GMMStatistics(object):
+    """Sufficient statistics of GMM
+    This class accumulates the zeroth, first, and second order statistics
+    of the GMM from data and responsibilities, and estimates the GMM
+    parameters from them (i.e., M-step).
+
+    Parameters
+    ----------
+    n_mix : int
+        The number of mixture components of the GMM
+    dim : int
+        The number of dimension of the joint feature vector
+    covtype : str, optional
+        The type of covariance matrix of the GMM
+        'full' : full-covariance matrix
+        'block_diag' : block-diagonal matrix
+        Default set to 'full'
+
+    Attributes
+    ----------
+    nk : array, shape (`n_mix`)
+        Zeroth order statistics
+    sx : array, shape (`n_mix`, `dim`)
+        First order statistics
+    sxx : array, shape (`n_mix`, `dim`, `dim`) or (`n_mix`, `dim`)
+        Second order statistics
+        Only diagonal elements are accumulated for 'block_diag'
+    sxy : array, shape (`n_mix`, `dim // 2`)
+        Second order statistics between source and target
+        Accumulated only for 'block_diag'
+
+    """
+
+    def __init__(self, n_mix, dim, covtype="full"):
+        self.n_mix = n_mix
+        self.dim = dim
+        self.covtype = covtype
+
+        self.nk = np.zeros(n_mix)
+        self.sx = np.zeros((n_mix, dim))
+        if self.covtype == "full":
+            self.sxx = np.zeros((n_mix, dim, dim))
+            self.sxy = None
+        elif self.covtype == "block_diag":
+            self.sxx = np.zeros((n_mix, dim))
+            self.sxy = np.zeros((n_mix, dim // 2))
+        else:
+            raise ValueError("Covariance type should be full or block_diag")
+
+    def accumulate(self, X, resp):
+        """Accumulate statistics from data and responsibilities
+
+        Parameters
+        ----------
+        X : array, shape (`T`, `dim`)
+            Joint feature vector
+        resp : array, shape (`T`, `n_mix`)
+            The responsibilities for each data sample in X
+            If `X` or `resp` is float32, e.g., by E-step in float32,
+            they are accumulated in float64, since the covariances are
+            estimated from the uncentered second order statistics.
+
+        """
+        X = np.asarray(X, dtype=np.float64)
+        resp = np.asarray(resp, dtype=np.float64)
+        self.nk += resp.sum(axis=0)
+        self.sx += np.dot(resp.T, X)
+        if self.covtype == "full":
+            for m in range(self.n_mix):
+                self.sxx[m] += np.dot((resp[:, m, np.newaxis] * X).T, X)
+        else:
+            D = self.dim // 2
+            self.sxx += np.dot(resp.T, X * X)
+            self.sxy += np.dot(resp.T, X[:, :D] * X[:, D:])
+        return self
+
+    def estimate_parameters(self, reg_covar=1e-6):
+        """Estimate GMM parameters from the statistics
+
+        Parameters
+        ----------
+        reg_covar : float, optional
+            The regularization added to the covariance matrices
+            Default set to 1e-6
+
+        Returns
+        -------
+        weights : array, shape (`n_mix`)
+            Mixture component weights
+        means : array, shape (`n_mix`, `dim`)
+            Mean vectors
+        covariances : array, shape (`n_mix`, `dim`, `dim`)
+            Full covariance matrices
+
+        """
+        if self.covtype == "block_diag":
+            weights, means, diagcov, xycov = \
+                self.estimate_block_diag_parameters(reg_covar=reg_covar)
+            D = self.dim // 2
+            covariances = np.zeros((self.n_mix, self.dim, self.dim))
+            covariances[:, np.arange(self.dim), np.arange(self.dim)] = diagcov
+            covariances[:, np.arange(D, self.dim), np.arange(D)] = xycov
+            covariances[:, np.arange(D), np.arange(D, self.dim)] = xycov
+            return weights, means, covariances
+
+        nk = self.nk + 10 * np.finfo(self.nk.dtype).eps
+        weights = nk / np.sum(nk)
+        means = self.sx / nk[:, np.newaxis]
+        covariances = self.sxx / nk[:, np.newaxis, np.newaxis] - np.einsum(
+            "mi,mj->mij", means, means)
+        covariances[:, np.arange(self.dim), np.arange(self.dim)] += reg_covar
+        return weights, means, covariances
+
+    def estimate_block_diag_parameters(self, reg_covar=1e-6):
+        """Estimate block-diagonal GMM parameters from the statistics
+
+        Parameters
+        ----------
+        reg_covar : float, optional
+            The regularization added to the covariances
+            Default set to 1e-6
+
+        Returns
+        -------
+        weights : array, shape (`n_mix`)
+            Mixture component weights
+        means : array, shape (`n_mix`, `dim`)
+            Mean vectors
+        diagcov : array, shape (`n_mix`, `dim`)
+            Diagonal elements of the covariance matrices
+        xycov : array, shape (`n_mix`, `dim // 2`)
+            Cross covariance between source and target in each dimension
+
+        """
+        if self.covtype != "block_diag":
+            raise ValueError("Statistics are not accumulated for block_diag")
+
+        nk = self.nk + 10 * np.finfo(self.nk.dtype).eps
+        weights = nk / np.sum(nk)
+        means = self.sx / nk[:, np.newaxis]
+
+        D = self.dim // 2
+        diagcov = self.sxx / nk[:, np.newaxis] - means ** 2 + reg_covar
+        xycov = (self.sxy / nk[:, np.newaxis] - means[:, :D] * means[:, D:] +
+                 reg_covar)
+        return weights, means, diagcov, xycov
+
+    def save(self, fpath):
+        """Save the statistics into h5 file
+
+        Parameters
+        ----------
+        fpath : str
+            Path of h5 file
+
+        """
+        # write into temporary file and replace it to keep the statistics
+        # consistent even if the process is interrupted while writing
+        tmppath = fpath + ".tmp"
+        with HDF5(tmppath, mode="w") as h5:
+            h5.save(self.covtype, ext="covtype")
+            h5.save(self.nk, ext="nk")
+            h5.save(self.sx, ext="sx")
+            h5.save(self.sxx, ext="sxx")
+            if self.sxy is not None:
+                h5.save(self.sxy, ext="sxy")
+        os.replace(tmppath, fpath)
+
+    @classmethod
+    def open_from_file(cls, fpath):
+        """Open the statistics from h5 file
+
+        Parameters
+        ----------
+        fpath : str
+            Path of h5 file saved by `save`
+
+        Returns
+        -------
+        stats : GMMStatistics
+            Sufficient statistics of the GMM
+
+        """
+        with HDF5(fpath, mode="r") as h5:
+            covtype = h5.read(ext="covtype")
+            covtype = covtype.decode() if isinstance(covtype, bytes) else str(covtype)
+            sx = h5.read(ext="sx")
+            stats = cls(sx.shape[0], sx.shape[1], covtype=covtype)
+            stats.nk = h5.read(ext="nk")
+            stats.sx = sx
+            stats.sxx = h5.read(ext="sxx")
+            if stats.sxy is not None:
+                stats.sxy = h5.read(ext="sxy")
+        return stats
+
+    def __add__(self, other):
+        stats = GMMStatistics(self.n_mix, self.dim, covtype=self.covtype)
+        stats.nk = self.nk + other.nk
+        stats.sx = self.sx + other.sx
+        stats.sxx = self.sxx + other.sxx
+        if self.sxy is not None:
+            stats.sxy = self.sxy + other.sxy
+        return stats
+
+    def __mul__(self, scale):
+        stats = GMMStatistics(self.n_mix, self.dim, covtype=self.covtype)
+        stats.nk = scale * self.nk
+        stats.sx = scale * self.sx
+        stats.sxx = scale * self.sxx
+        if self.sxy is not None:
+            stats.sxy = scale * self.sxy
+        return stats
+
+    __rmul__ = __mul__
@@ -67,8 +67,14 @@ class GV (object):
         ---------
         filtered_data : array, shape (`T`, `data`)
             Array of GV postfiltered data sequence
+            The dtype is float32 if `data` is float32.
 
         """
+        if data.dtype == np.float32:
+            # keep single precision of data
+            gvstats = gvstats.astype(np.float32)
+            if cvgvstats is not None:
+                cvgvstats = cvgvstats.astype(np.float32)
 
         # get length and dimension
         T, dim = data.shape
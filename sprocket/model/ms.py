@@ -70,6 +70,7 @@ class MS (object):
         -------
         filtered_data : array, shape (`T`, `data`)
             Array of MS postfiltered data sequence
+            The dtype is float32 if `data` is float32.
         """
 
         # get length and dimension
@@ -87,6 +88,9 @@ class MS (object):
         reconst_complexspec = np.exp(msed_logpowerspec / 2) * (np.cos(phasespec) +
                                                                np.sin(phasespec) * 1j)
         filtered_data = np.fft.ifftn(reconst_complexspec)[:T].real
+        if data.dtype == np.float32:
+            # keep single precision of data
+            filtered_data = filtered_data.astype(np.float32)
 
         if startdim == 1:
             filtered_data[:, 0] = data[:, 0]
@@ -114,7 +118,7 @@ class MS (object):
 
         # create zero padded data
         T, dim = data.shape
-        padded_data = np.zeros((self.fftsize, dim))
+        padded_data = np.zeros((self.fftsize, dim), dtype=data.dtype)
         padded_data[:T] += data
 
         # calculate log power spectum of data
@@ -1,8 +1,15 @@
 import unittest
 
+import os
+import pickle
 import numpy as np
 from sprocket.model import GMMTrainer, GMMConvertor
-from sprocket.util import static_delta
+from sprocket.model.diagGMM import BlockDiagonalGaussianMixture
+from sprocket.model.GMM import compute_precision_cholesky
+from sklearn.mixture._gaussian_mixture import _estimate_log_gaussian_prob
+from sprocket.util import HDF5, static_delta
+
+dirpath = os.path.dirname(os.path.realpath(__file__))
 
 
 class BDGMMTest(unittest.TestCase):
@@ -22,3 +29,125 @@ class BDGMMTest(unittest.TestCase):
         odata = gmm_cv.convert(sddata, cvtype='mmse')
 
         assert data.shape == odata.shape
+
+    def test_BlockDiagonalGMM_convert(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=8, n_iter=10, covtype='block_diag')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = static_delta(data)
+        for gmmmode in [None, 'diff', 'intra']:
+            # block diagonal conversion is detected from param
+            gmm_cv = GMMConvertor(n_mix=8, gmmmode=gmmmode)
+            gmm_cv.open_from_param(gmm_tr.param)
+            assert gmm_cv.covtype == 'block_diag'
+            assert gmm_cv.A.shape == (8, 10)
+
+            full_cv = GMMConvertor(n_mix=8, covtype='full', gmmmode=gmmmode)
+            full_cv.open_from_param(gmm_tr.param)
+
+            assert np.allclose(gmm_cv.estimate_posterior(sddata)[1],
+                               full_cv.estimate_posterior(sddata)[1])
+            for cvtype in ['mlpg', 'mmse']:
+                odata = gmm_cv.convert(sddata, cvtype=cvtype)
+                assert np.allclose(odata, full_cv.convert(sddata, cvtype=cvtype))
+            gmm_cv.solver = 'sparse'
+            assert np.allclose(gmm_cv.convert(sddata, cvtype='mlpg'),
+                               full_cv.convert(sddata, cvtype='mlpg'))
+
+    def test_BlockDiagonalGMM_fit(self):
+        jnt = np.r_[np.random.randn(500, 20), np.random.randn(500, 20) + 5]
+
+        # early stopping
+        log = []
+        np.random.seed(0)
+        bdgmm = BlockDiagonalGaussianMixture(n_mix=4, n_iter=100)
+        bdgmm.fit(jnt, callback=log.append)
+        assert bdgmm.converged_
+        assert bdgmm.n_iter_ == len(log) < 100
+        assert abs(log[-1]['change']) < bdgmm.tol
+        assert log[-1]['lower_bound'] == bdgmm.lower_bound_
+
+        # resume from checkpoint
+        path = os.path.join(dirpath, 'data', 'test_checkpoint.h5')
+        np.random.seed(0)
+        bdgmm_ckpt = BlockDiagonalGaussianMixture(n_mix=4, n_iter=2)
+        bdgmm_ckpt.fit(jnt, checkpoint=path, checkpoint_interval=10)
+        # saved at the end of the training before the interval
+        assert os.path.exists(path)
+
+        # checkpoint of different GMM
+        for n_mix, data in [(8, jnt), (4, jnt[:, :10])]:
+            mismatched = BlockDiagonalGaussianMixture(n_mix=n_mix)
+            with self.assertRaisesRegex(ValueError, 'Checkpoint'):
+                mismatched.fit(data, checkpoint=path)
+
+        resumed = BlockDiagonalGaussianMixture(n_mix=4, n_iter=100)
+        resumed.fit(jnt, checkpoint=path)
+
+        # training is not continued from converged checkpoint
+        log = []
+        finished = BlockDiagonalGaussianMixture(n_mix=4, n_iter=100)
+        finished.fit(jnt, callback=log.append, checkpoint=path)
+        os.remove(path)
+        assert len(log) == 0
+        assert finished.converged_
+        assert finished.n_iter_ == resumed.n_iter_
+        assert finished.lower_bound_ == resumed.lower_bound_
+        assert np.array_equal(finished.means_, resumed.means_)
+        assert resumed.n_iter_ == bdgmm.n_iter_
+        assert np.allclose(resumed.means_, bdgmm.means_)
+        assert np.allclose(resumed.covariances_, bdgmm.covariances_)
+
+    def test_BlockDiagonalGMM_log_prob(self):
+        jnt = np.random.rand(1000, 20)
+        bdgmm = BlockDiagonalGaussianMixture(n_mix=4, n_iter=10)
+        bdgmm.fit(jnt)
+
+        # compare closed-form with full-covariance calculation
+        precisions_chol = compute_precision_cholesky(bdgmm.covariances_)
+        assert np.allclose(bdgmm.precisions_cholesky_, precisions_chol)
+        log_prob = _estimate_log_gaussian_prob(
+            jnt, bdgmm.means_, precisions_chol, 'full')
+        assert np.allclose(bdgmm._estimate_log_prob(jnt), log_prob)
+
+    def test_BlockDiagonalGMM_legacy_format(self):
+        jnt = np.random.rand(1000, 20)
+        bdgmm = BlockDiagonalGaussianMixture(n_mix=4, n_iter=10)
+        bdgmm.fit(jnt)
+
+        # state of model pickled with full-covariance matrices
+        state = dict(bdgmm.__getstate__())
+        del state['diagcov_'], state['xycov_']
+        state['covariances_'] = bdgmm.covariances_
+        state['precisions_cholesky_'] = bdgmm.precisions_cholesky_
+        legacy = BlockDiagonalGaussianMixture.__new__(
+            BlockDiagonalGaussianMixture)
+        legacy.__setstate__(state)
+        legacy = pickle.loads(pickle.dumps(legacy))
+        assert np.array_equal(legacy.diagcov_, bdgmm.diagcov_)
+        assert np.array_equal(legacy.xycov_, bdgmm.xycov_)
+
+        data = static_delta(np.random.rand(200, 5))
+        for covtype in ['full', 'block_diag']:
+            gmm_cv = GMMConvertor(n_mix=4, covtype=covtype)
+            gmm_cv.open_from_param(legacy)
+            ref_cv = GMMConvertor(n_mix=4, covtype=covtype)
+            ref_cv.open_from_param(bdgmm)
+            assert np.allclose(gmm_cv.convert(data), ref_cv.convert(data))
+
+        # checkpoint saved with full-covariance matrices
+        path = os.path.join(dirpath, 'data', 'test_legacy_checkpoint.h5')
+        with HDF5(path, mode='w') as h5:
+            h5.save(bdgmm.weights_, ext='weights')
+            h5.save(bdgmm.means_, ext='means')
+            h5.save(bdgmm.covariances_, ext='covariances')
+            h5.save(bdgmm.n_iter_, ext='n_iter')
+            h5.save(bdgmm.lower_bound_, ext='lower_bound')
+        resumed = BlockDiagonalGaussianMixture(n_mix=4, n_iter=10)
+        try:
+            resumed.fit(jnt, checkpoint=path)
+        finally:
+            os.remove(path)
+        assert np.allclose(resumed.means_, bdgmm.means_)
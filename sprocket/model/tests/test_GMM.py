@@ -1,8 +1,13 @@
 import unittest
 
+import copy
 import os
 import numpy as np
-from sprocket.model import GMMTrainer, GMMConvertor
+from sklearn.mixture import GaussianMixture
+import sprocket.model.GMM as gmm_module
+from sprocket.model import GMMTrainer, GMMConvertor, GMMStreamConvertor
+from sprocket.model.gmmstats import GMMStatistics
+from sprocket.util import HDF5, construct_coreset
 from sprocket.util import delta
 
 dirpath = os.path.dirname(os.path.realpath(__file__))
@@ -32,3 +37,418 @@ class ModelGMMTest(unittest.TestCase):
         Aparam = gmm_tr.train_singlepath(Ajnt)
         Bparam = gmm_tr.train_singlepath(Bjnt)
         assert np.allclose(Aparam.weights_, Bparam.weights_)
+
+    def test_GMM_gmmmap(self):
+        jnt = np.random.rand(100, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full', chunksize=64)
+        gmm_cv.open_from_param(gmm_tr.param)
+        cseq, _, mseq = gmm_cv._gmmmap(sddata)
+
+        # compare with frame-by-frame calculation
+        for t in range(len(sddata)):
+            m = cseq[t]
+            assert np.allclose(mseq[t], gmm_cv.meanY[m] + gmm_cv.A[m] @
+                               (sddata[t] - gmm_cv.meanX[m]))
+
+    def test_GMM_mmse(self):
+        jnt = np.random.rand(100, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full', chunksize=64)
+        gmm_cv.open_from_param(gmm_tr.param)
+        _, wseq, _ = gmm_cv._gmmmap(sddata)
+        odata = gmm_cv.convert(sddata, cvtype='mmse')
+
+        # compare with frame-by-frame calculation
+        ref = np.zeros((len(sddata), 10))
+        for t in range(len(sddata)):
+            for m in range(4):
+                ref[t] += wseq[t, m] * (gmm_cv.meanY[m] + gmm_cv.A[m] @
+                                        (sddata[t] - gmm_cv.meanX[m]))
+        assert np.allclose(odata, ref[:, :5])
+
+        # posterior pruning
+        gmm_cv.mmse_threshold = 1e-5
+        podata = gmm_cv.convert(sddata, cvtype='mmse')
+        assert np.allclose(podata, odata, atol=1e-3)
+        gmm_cv.mmse_threshold = 1.0
+        podata = gmm_cv.convert(sddata, cvtype='mmse')
+        assert data.shape == podata.shape
+
+    def test_GMM_mlpg_solver(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full', solver='banded')
+        gmm_cv.open_from_param(gmm_tr.param)
+        odata = gmm_cv.convert(sddata, cvtype='mlpg')
+
+        gmm_cv.solver = 'sparse'
+        sodata = gmm_cv.convert(sddata, cvtype='mlpg')
+        assert np.allclose(odata, sodata)
+
+        gmm_cv.solver = 'cg'
+        cgodata = gmm_cv.convert(sddata, cvtype='mlpg')
+        assert np.allclose(odata, cgodata, atol=1e-5)
+
+    def test_GMM_stream_convert(self):
+        jnt = np.random.rand(100, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full')
+        gmm_cv.open_from_param(gmm_tr.param)
+        odata = gmm_cv.convert(sddata, cvtype='mlpg')
+
+        # emit frames with bounded latency
+        stream_cv = GMMStreamConvertor(gmm_cv, lookahead=5)
+        sodata = []
+        for t in range(0, len(sddata), 3):
+            sodata.append(stream_cv.push(sddata[t:t + 3]))
+            assert sum(map(len, sodata)) >= min(t + 3, len(sddata)) - 5
+        sodata.append(stream_cv.flush())
+        assert np.concatenate(sodata).shape == odata.shape
+
+        # identical to utterance-level MLPG if lookahead covers the input
+        stream_cv = GMMStreamConvertor(gmm_cv, lookahead=len(sddata))
+        assert len(stream_cv.push(sddata)) == 0
+        assert np.allclose(stream_cv.flush(), odata)
+
+    def test_GMM_convert_batch(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full')
+        gmm_cv.open_from_param(gmm_tr.param)
+        datalist = [np.random.rand(T, 5) for T in [50, 120, 80]]
+        sddatalist = [np.c_[data, delta(data)] for data in datalist]
+        for cvtype in ['mlpg', 'mmse']:
+            odatalist = gmm_cv.convert_batch(sddatalist, cvtype=cvtype)
+            assert len(odatalist) == len(sddatalist)
+            for sddata, odata in zip(sddatalist, odatalist):
+                assert np.allclose(odata, gmm_cv.convert(sddata, cvtype=cvtype))
+
+    def test_GMM_compiled_model(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        path = os.path.join(dirpath, 'data', 'test_compiled.h5')
+        for gmmmode in [None, 'diff']:
+            gmm_cv = GMMConvertor(n_mix=4, covtype='full', gmmmode=gmmmode)
+            gmm_cv.open_from_param(gmm_tr.param)
+            gmm_cv.export(path)
+
+            compiled_cv = GMMConvertor()
+            compiled_cv.open_from_file(path)
+            assert compiled_cv.n_mix == 4
+            assert compiled_cv.gmmmode == gmmmode
+            for cvtype in ['mlpg', 'mmse']:
+                assert np.allclose(compiled_cv.convert(sddata, cvtype=cvtype),
+                                   gmm_cv.convert(sddata, cvtype=cvtype))
+            del compiled_cv
+        os.remove(path)
+
+    def test_GMM_posterior(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(200, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full', chunksize=64)
+        gmm_cv.open_from_param(gmm_tr.param)
+        log_wseq, wseq, cseq = gmm_cv.estimate_posterior(sddata)
+
+        # compare with sklearn-based posterior
+        pX = GaussianMixture(n_components=4, covariance_type='full')
+        pX.weights_ = gmm_cv.w
+        pX.means_ = gmm_cv.meanX
+        pX.precisions_cholesky_ = gmm_cv.precX_chol
+        assert np.allclose(wseq, pX.predict_proba(sddata))
+        assert np.allclose(np.exp(log_wseq), wseq)
+        assert np.array_equal(cseq, np.argmax(wseq, axis=1))
+
+        # float32 mode
+        _, wseq32, _ = gmm_cv.estimate_posterior(sddata.astype(np.float32))
+        assert wseq32.dtype == np.float32
+        assert np.allclose(wseq32, wseq, atol=1e-3)
+
+    def test_GMM_convert_chunked(self):
+        jnt = np.random.rand(1000, 20)
+        gmm_tr = GMMTrainer(n_mix=4, n_iter=100, covtype='full')
+        gmm_tr.train(jnt)
+
+        data = np.random.rand(500, 5)
+        sddata = np.c_[data, delta(data)]
+        gmm_cv = GMMConvertor(n_mix=4, covtype='full')
+        gmm_cv.open_from_param(gmm_tr.param)
+        for cvtype in ['mlpg', 'mmse']:
+            odata = gmm_cv.convert(sddata, cvtype=cvtype)
+            codata = gmm_cv.convert_chunked(sddata, cvtype=cvtype,
+                                            chunklen=60, overlap=100)
+            assert np.allclose(codata, odata, atol=1e-6)
+
+        # parallel conversion
+        codata = gmm_cv.convert_chunked(sddata, chunklen=60, overlap=20)
+        pcodata = gmm_cv.convert_chunked(sddata, chunklen=60, overlap=20,
+                                         n_jobs=2)
+        assert np.array_equal(codata, pcodata)
+
+    def test_GMM_train_mapreduce(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt)
+
+            params = []
+            for n_jobs in [1, 2]:
+                np.random.seed(0)
+                mr_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+                mr_tr.train(jnt, n_jobs=n_jobs, shardsize=700)
+                params.append(mr_tr.param)
+            assert np.array_equal(params[0].means_, params[1].means_)
+            assert np.array_equal(params[0].covariances_,
+                                  params[1].covariances_)
+            assert (params[0].score(jnt) >
+                    gmm_tr.param.score(jnt) - 0.2)
+
+        # serial map-reduce does not share the state by the worker globals
+        assert not hasattr(gmm_module, '_worker_em')
+
+    def test_GMM_train_warm_start(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=5, covtype=covtype)
+            gmm_tr.train(jnt)
+            score = gmm_tr.param.score(jnt)
+            means = gmm_tr.param.means_.copy()
+
+            warm_tr = GMMTrainer(n_mix=4, n_iter=3, covtype=covtype)
+            warm_tr.open_from_param(gmm_tr.param)
+            warm_tr.train(jnt + 0.01, warm_start=True)
+            assert warm_tr.param.n_iter_ <= 3
+            assert not warm_tr.param.warm_start
+            assert np.allclose(warm_tr.param.means_, means + 0.01, atol=0.1)
+            assert warm_tr.param.score(jnt + 0.01) > score - 0.05
+
+    def test_GMM_train_lbg(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt)
+
+            lbg_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            params = lbg_tr.train_lbg(jnt, n_split_iter=3)
+            assert [len(p.weights_) for p in params] == [1, 2, 4]
+            assert params[-1] is not lbg_tr.param
+            assert np.allclose(params[-1].means_, lbg_tr.param.means_)
+            assert lbg_tr.n_iter == 10
+            assert params[1].score(jnt) > params[0].score(jnt)
+            assert lbg_tr.param.score(jnt) > gmm_tr.param.score(jnt) - 0.2
+
+            # the number of mixtures is not a power of 2
+            lbg_tr = GMMTrainer(n_mix=3, n_iter=10, covtype=covtype)
+            params = lbg_tr.train_lbg(jnt, n_split_iter=3)
+            assert [len(p.weights_) for p in params] == [1, 2, 3]
+
+    def test_GMM_train_weighted(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        coreset, weights = construct_coreset(jnt, 1000, n_clusters=8)
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt)
+
+            coreset_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            coreset_tr.train(coreset, sample_weight=weights)
+            assert np.allclose(np.sum(coreset_tr.param.weights_), 1.0)
+            assert (coreset_tr.param.score(jnt) >
+                    gmm_tr.param.score(jnt) - 1.0)
+
+            # integer weights are equivalent to repeated frames
+            _, log_resp = gmm_tr.param._e_step(jnt[:100])
+            w = np.random.randint(1, 3, size=100)
+            gmm_tr.param._m_step(np.repeat(jnt[:100], w, axis=0),
+                                 np.repeat(log_resp, w, axis=0))
+            means = gmm_tr.param.means_
+            gmm_tr.open_from_param(gmm_tr.param)
+            stats = GMMStatistics(4, 20, covtype=covtype).accumulate(
+                jnt[:100], np.exp(log_resp) * w[:, np.newaxis])
+            gmm_tr._open_statistics(stats)
+            assert np.allclose(means, gmm_tr.param.means_)
+
+    def test_GMM_train_online(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        path = os.path.join(dirpath, 'data', 'test_online.h5')
+        h5 = HDF5(path, mode='w')
+        h5.save(jnt, ext='jnt')
+        h5.close()
+
+        for covtype in ['full', 'block_diag']:
+            # M-step from statistics equals to batch M-step
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt)
+            _, log_resp = gmm_tr.param._e_step(jnt)
+            stats = GMMStatistics(4, 20, covtype=covtype).accumulate(
+                jnt, np.exp(log_resp))
+            gmm_tr._open_statistics(stats)
+            weights, means = gmm_tr.param.weights_, gmm_tr.param.means_
+            covariances = gmm_tr.param.covariances_
+            gmm_tr.param._m_step(jnt, log_resp)
+            assert np.allclose(weights, gmm_tr.param.weights_)
+            assert np.allclose(means, gmm_tr.param.means_)
+            assert np.allclose(covariances, gmm_tr.param.covariances_)
+
+            # online training from h5 dataset
+            h5 = HDF5(path, mode='r')
+            online_tr = GMMTrainer(n_mix=4, covtype=covtype)
+            online_tr.train_online(h5.h5['jnt'], batchsize=500,
+                                   blocksize=50, n_epoch=2)
+            h5.close()
+            assert np.allclose(np.sum(online_tr.param.weights_), 1.0)
+            assert (online_tr.param.score(jnt) >
+                    gmm_tr.param.score(jnt) - 0.2)
+        os.remove(path)
+
+    def test_GMM_float32(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt)
+
+            # E-step in float32 and M-step in float64
+            np.random.seed(0)
+            f32_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype,
+                                dtype=np.float32)
+            f32_tr.train(jnt.astype(np.float32))
+            assert f32_tr.param.means_.dtype == np.float64
+            assert (f32_tr.param.score(jnt) >
+                    gmm_tr.param.score(jnt) - 0.2)
+
+            data = np.random.randn(200, 5)
+            sddata = np.c_[data, delta(data)]
+            odata = {}
+            for dtype in [np.float64, np.float32]:
+                gmm_cv = GMMConvertor(n_mix=4, covtype=covtype, dtype=dtype)
+                gmm_cv.open_from_param(gmm_tr.param)
+                for cvtype in ['mlpg', 'mmse']:
+                    odata[dtype, cvtype] = gmm_cv.convert(sddata,
+                                                          cvtype=cvtype)
+            for cvtype in ['mlpg', 'mmse']:
+                assert odata[np.float32, cvtype].dtype == np.float32
+                assert np.allclose(odata[np.float32, cvtype],
+                                   odata[np.float64, cvtype], atol=1e-3)
+
+        with self.assertRaises(ValueError):
+            GMMConvertor(n_mix=4, dtype=np.float16)
+
+    def test_GMM_float32_offset(self):
+        # statistics of data far from the origin are accumulated without
+        # cancellation in float32
+        jnt = np.r_[np.random.randn(20000, 4), np.random.randn(20000, 4) + 5]
+        jnt = (jnt + 1000).astype(np.float32)
+        for covtype in ['full', 'block_diag']:
+            covs = []
+            for dtype in [np.float64, np.float32]:
+                gmm_tr = GMMTrainer(n_mix=2, n_iter=5, covtype=covtype,
+                                    dtype=dtype, random_state=0)
+                gmm_tr.train(jnt, n_jobs=1, shardsize=40000)
+                covs.append(gmm_tr.param.covariances_)
+            assert np.allclose(covs[1], covs[0], atol=1e-3)
+
+    def test_GMM_train_n_init(self):
+        jnt = np.r_[np.random.randn(500, 20), np.random.randn(500, 20) + 5,
+                    np.random.randn(500, 20) - 5]
+        for covtype in ['full', 'block_diag']:
+            params = []
+            for n_jobs in [None, 2]:
+                gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype,
+                                    n_init=3, random_state=0)
+                gmm_tr.train(jnt, n_jobs=n_jobs)
+                params.append(gmm_tr.param)
+                assert len(gmm_tr.seeds) == 3
+                assert (gmm_tr.param.lower_bound_ ==
+                        np.max(gmm_tr.lower_bounds))
+
+            # restarts are reproducible from the seed
+            assert np.array_equal(params[0].means_, params[1].means_)
+
+            # single restart from the best seed gives the same GMM
+            single_tr = GMMTrainer(
+                n_mix=4, n_iter=10, covtype=covtype,
+                random_state=gmm_tr.seeds[np.argmax(gmm_tr.lower_bounds)])
+            single_tr.train(jnt)
+            assert np.allclose(single_tr.param.means_, params[0].means_)
+        assert not hasattr(gmm_module, '_worker_restart')
+
+        with self.assertRaises(ValueError):
+            GMMTrainer(n_mix=4, n_init=0)
+
+    def test_GMM_update_and_adapt(self):
+        jnt = np.r_[np.random.randn(1500, 20), np.random.randn(1500, 20) + 5]
+        path = os.path.join(dirpath, 'data', 'test_stats.h5')
+        for covtype in ['full', 'block_diag']:
+            gmm_tr = GMMTrainer(n_mix=4, n_iter=10, covtype=covtype)
+            gmm_tr.train(jnt[::2])
+            stats = gmm_tr.estimate_statistics(jnt[::2])
+            stats.save(path)
+            score = gmm_tr.param.score(jnt)
+
+            # incremental update from saved statistics
+            update_tr = GMMTrainer(n_mix=4, covtype=covtype)
+            update_tr.open_from_param(copy.deepcopy(gmm_tr.param))
+            update_tr.stats = GMMStatistics.open_from_file(path)
+            assert np.array_equal(update_tr.stats.sxx, stats.sxx)
+            with self.assertRaises(ValueError):
+                update_tr.update(jnt[1::2], n_iter=0)
+            update_tr.update(jnt[1::2], n_iter=3)
+            assert np.allclose(update_tr.stats.nk.sum(), len(jnt))
+            assert update_tr.param.score(jnt) > score - 0.2
+
+            # MAP adaptation of means to shifted data
+            shifted = jnt[:300] + 1.0
+            for relevance_factor, params in [(0.0, 'wmc'), (1e6, 'm'),
+                                             (16.0, 'm')]:
+                adapt_tr = GMMTrainer(n_mix=4, covtype=covtype)
+                adapt_tr.open_from_param(copy.deepcopy(gmm_tr.param))
+                adapt_tr.adapt(shifted, relevance_factor=relevance_factor,
+                               params=params)
+                if relevance_factor == 0.0:
+                    # ML estimates without prior
+                    _, log_resp = gmm_tr.param._e_step(shifted)
+                    ml_param = copy.deepcopy(gmm_tr.param)
+                    ml_param._m_step(shifted, log_resp)
+                    assert np.allclose(adapt_tr.param.means_,
+                                       ml_param.means_)
+                    assert np.allclose(adapt_tr.param.covariances_,
+                                       ml_param.covariances_)
+                elif relevance_factor == 1e6:
+                    assert np.allclose(adapt_tr.param.means_,
+                                       gmm_tr.param.means_, atol=1e-2)
+                else:
+                    assert np.array_equal(adapt_tr.param.covariances_,
+                                          gmm_tr.param.covariances_)
+                    assert (adapt_tr.param.score(shifted) >
+                            gmm_tr.param.score(shifted))
+        os.remove(path)
+
+        with self.assertRaises(ValueError):
+            GMMTrainer(n_mix=4).update(jnt)
+        with self.assertRaises(ValueError):
+            gmm_tr.adapt(jnt, params='x')
@@ -1,4 +1,5 @@
-from .feature_extractor import FeatureExtractor
+from .feature_extractor import FeatureExtractor, AcousticFeatures
+from .feature_cache import FeatureCache
 from .synthesizer import Synthesizer, mod_power
 from .shifter import Shifter
 from .wsola import WSOLA
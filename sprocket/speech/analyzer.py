@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fractions import Fraction
+
+import numpy as np
 import pyworld
 
 
@@ -61,6 +65,120 @@ class WORLD(object):
         assert spc.shape == ap.shape
         return f0, spc, ap
 
+    def analyze_parallel(self, x, workers=2, segmentsec=60.0, marginsec=1.0,
+                         backend='thread'):
+        """Analyze acoustic features of a long waveform in parallel
+
+        The waveform is split into segments of about `segmentsec` at
+        low-energy points, and the segments with margins of `marginsec`
+        on both sides are analyzed concurrently. The segments start at
+        frames whose times fall on sample points, so that the frames of
+        the segments are aligned to those of `analyze`. The sequences are
+        identical to those of `analyze` except around the split points.
+
+        Paramters
+        ---------
+        x : array, shape (`T`)
+            monoral speech signal in time domain
+        workers : int, optional
+            The number of workers
+            Default set to 2
+        segmentsec : float, optional
+            Approximate length of a segment [sec]
+            Default set to 60.0
+        marginsec : float, optional
+            Length of the margin analyzed with a segment [sec]
+            Default set to 1.0
+        backend : str, optional
+            Type of workers
+            'thread' : threads, which run in parallel while pyworld
+                       releases the GIL
+            'process' : processes
+            Default set to 'thread'
+
+        Returns
+        ---------
+        f0 : array, shape (`T`,)
+            F0 sequence
+        spc : array, shape (`T`, `fftl / 2 + 1`)
+            Spectral envelope sequence
+        ap: array, shape (`T`, `fftl / 2 + 1`)
+            aperiodicity sequence
+
+        """
+        if backend == 'thread':
+            executor_class = ThreadPoolExecutor
+        elif backend == 'process':
+            executor_class = ProcessPoolExecutor
+        else:
+            raise ValueError('backend should be thread or process')
+
+        # frames at multiples of `step` fall on sample points
+        hop = Fraction(self.fs) * Fraction(self.shiftms).limit_denominator() / 1000
+        step = hop.denominator
+        n_frames = int(len(x) / self.fs * 1000 / self.shiftms) + 1
+        seglen = max(int(segmentsec * 1000 / self.shiftms) // step, 1) * step
+        margin = int(np.ceil(marginsec * 1000 / self.shiftms / step)) * step
+
+        bounds = self._split_frames(x, n_frames, seglen, hop)
+        if len(bounds) == 2:
+            return self.analyze(x)
+
+        segments, offsets = [], []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            mstart = max(start - margin, 0)
+            if end == n_frames:
+                mend = len(x)
+            else:
+                mend = min(int(np.ceil((end + margin) * hop)), len(x))
+            segments.append(x[int(mstart * hop):mend])
+            offsets.append((start - mstart, end - mstart))
+
+        with executor_class(max_workers=workers) as executor:
+            results = list(executor.map(self.analyze, segments))
+
+        f0, spc, ap = [
+            np.concatenate([feat[s:e] for feat, (s, e) in zip(feats, offsets)])
+            for feats in zip(*results)]
+        return f0, spc, ap
+
+    def _split_frames(self, x, n_frames, seglen, hop):
+        """Find frames splitting the waveform at low-energy points
+
+        Parameters
+        ---------
+        x : array, shape (`T`)
+            monoral speech signal in time domain
+        n_frames : int
+            The number of frames of the waveform
+        seglen : int
+            Approximate number of frames of a segment
+        hop : Fraction
+            Shift length [sample]
+
+        Returns
+        ---------
+        bounds : list
+            Frames of the boundaries of segments including 0 and `n_frames`
+
+        """
+        step = hop.denominator
+        width = int(np.ceil(2 * hop))
+        cumpow = np.r_[0.0, np.cumsum(np.asarray(x, dtype=np.float64) ** 2)]
+
+        bounds = [0]
+        while n_frames - bounds[-1] >= 1.5 * seglen:
+            # search the frame of minimum energy around the target frame
+            target = bounds[-1] + seglen
+            frames = np.arange(target - (seglen // 4) // step * step,
+                               target + seglen // 4 + 1, step)
+            samples = np.array([int(j * hop) for j in frames])
+            energy = (cumpow[np.minimum(samples + width, len(x))] -
+                      cumpow[np.maximum(samples - width, 0)])
+            bounds.append(int(frames[np.argmin(energy)]))
+        bounds.append(n_frames)
+        return bounds
+
     def analyze_f0(self, x):
         """Analyze decomposes a speech signal into F0:
 
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import threading
+import time
+
+import numpy as np
+
+from sprocket.util.hdf5 import HDF5
+
+
+class FeatureCache(object):
+
+    """Content-addressed cache of acoustic features on local disk
+
+    Each feature is saved into an h5 file named by the digest of the
+    waveform, the analysis configuration, and the feature type, so that
+    the same waveform analyzed with the same configuration is not
+    analyzed again, even by different scripts or processes. When the total
+    size of the files exceeds `max_bytes`, the least recently used files
+    are removed. The total size is tracked in memory after the first scan of
+    the directory, which is scanned again only when the tracked size exceeds
+    `max_bytes`. Temporary files left by interrupted writers are removed in
+    the scan once they are older than `tmp_age`.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the cache files
+    max_bytes : int, optional
+        Maximum total size of the cache files [byte]
+        Default set to 10 * 2 ** 30
+    tmp_age : float, optional
+        Age of temporary files regarded as left by interrupted writers [sec]
+        Default set to 3600
+
+    """
+
+    def __init__(self, cache_dir, max_bytes=10 * 2 ** 30, tmp_age=3600):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.tmp_age = tmp_age
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # total size of the files tracked after the first scan
+        self._size = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # the lock is not picklable, and the size tracked in this process
+        # is not shared with the other processes
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_size'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def key(self, digest, config, feature):
+        """Return key of the feature
+
+        Parameters
+        ----------
+        digest : str
+            Digest of the waveform returned by `digest`
+        config : tuple
+            Analysis configuration, e.g., analyzer, fs, fftl, shiftms,
+            minf0, and maxf0
+        feature : str
+            Feature type including its parameters, e.g., 'mcep_24_0.42'
+
+        Returns
+        -------
+        key : str
+            Key of the feature
+
+        """
+        config = '_'.join(str(c) for c in config)
+        return hashlib.sha256(
+            '{}:{}:{}'.format(digest, config, feature).encode()).hexdigest()
+
+    def digest(self, x):
+        """Return digest of the waveform
+
+        Parameters
+        ----------
+        x : array
+            Array of waveform samples
+
+        Returns
+        -------
+        digest : str
+            SHA-256 digest of the samples as float64
+
+        """
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        return hashlib.sha256(x.tobytes()).hexdigest()
+
+    def load(self, key):
+        """Load the feature from the cache
+
+        Parameters
+        ----------
+        key : str
+            Key of the feature
+
+        Returns
+        -------
+        feature : array
+            Cached feature, or `None` if the feature is not cached
+
+        """
+        path = self._path(key)
+        try:
+            with HDF5(path, mode='r') as h5:
+                feature = h5.read(ext='feature')
+            # update access time for LRU eviction
+            os.utime(path)
+        except (OSError, KeyError):
+            # not cached or removed by another process
+            return None
+        return feature
+
+    def save(self, key, feature):
+        """Save the feature into the cache
+
+        Parameters
+        ----------
+        key : str
+            Key of the feature
+        feature : array
+            Feature to be cached
+
+        """
+        # write into temporary file and replace it so that the readers
+        # never see an incomplete file
+        path = self._path(key)
+        tmppath = '{}.{}.{}.tmp'.format(path, os.getpid(),
+                                        threading.get_ident())
+        try:
+            with HDF5(tmppath, mode='w') as h5:
+                h5.save(feature, ext='feature')
+            size = os.path.getsize(tmppath)
+            try:
+                size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(tmppath, path)
+        except BaseException:
+            if os.path.exists(tmppath):
+                os.remove(tmppath)
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._evict()
+            else:
+                # files saved by other processes are counted when the tracked
+                # size exceeds the limit and the directory is scanned again
+                self._size += size
+                if self._size > self.max_bytes:
+                    self._evict()
+
+    def size(self):
+        """Return total size of the cache files
+
+        Returns
+        -------
+        size : int
+            Total size of the cache files [byte]
+
+        """
+        entries, tmpsize = self._entries()
+        return sum(st.st_size for _, st in entries) + tmpsize
+
+    def _evict(self):
+        entries, tmpsize = self._entries()
+        size = sum(st.st_size for _, st in entries) + tmpsize
+        for path, st in sorted(entries, key=lambda e: e[1].st_mtime_ns):
+            if size <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # removed by another process
+                pass
+            size -= st.st_size
+        self._size = size
+
+    def _entries(self):
+        # return the cache files and total size of the temporary files being
+        # written, and remove the temporary files left by interrupted writers
+        entries = []
+        tmpsize = 0
+        now = time.time()
+        for fname in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, fname)
+            try:
+                st = os.stat(path)
+                if fname.endswith('.h5'):
+                    entries.append((path, st))
+                elif fname.endswith('.tmp'):
+                    if now - st.st_mtime > self.tmp_age:
+                        os.remove(path)
+                    else:
+                        tmpsize += st.st_size
+            except FileNotFoundError:
+                # replaced or removed by another process
+                pass
+        return entries, tmpsize
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + '.h5')
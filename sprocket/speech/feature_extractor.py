@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from collections import namedtuple
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+
 import pysptk
 import pyworld
 import numpy as np
@@ -7,6 +11,36 @@ import numpy as np
 from .analyzer import WORLD
 from .parameterizer import spc2npow
 
+FEATURES = ('f0', 'spc', 'ap', 'mcep', 'npow', 'codeap')
+
+
+class AcousticFeatures(namedtuple('AcousticFeatures', FEATURES)):
+
+    """Immutable bundle of acoustic features of a waveform
+
+    Features which are not extracted are set to `None`. The arrays are
+    not shared with the FeatureExtractor, and they are kept writable
+    so that they can be passed to pyworld.
+
+    Attributes
+    ----------
+    f0 : array, shape (`T`,)
+        F0 sequence
+    spc : array, shape (`T`, `fftl / 2 + 1`)
+        Spectral envelope sequence
+    ap : array, shape (`T`, `fftl / 2 + 1`)
+        Aperiodicity sequence
+    mcep : array, shape (`T`, `dim + 1`)
+        Mel-cepstrum sequence
+    npow : array, shape (`T`,)
+        Normalized power sequence
+    codeap : array, shape (`T`, `dim`)
+        Encoded aperiodicity sequence
+
+    """
+
+    __slots__ = ()
+
 
 class FeatureExtractor(object):
 
@@ -36,17 +70,24 @@ class FeatureExtractor(object):
     maxf0 : float, optional
         Ceil value for F0 estimation
         Default set to 500
+    cache : FeatureCache, optional
+        Cache of F0, spectral envelope, aperiodicity, and mel-cepstrum,
+        which are read from the cache instead of analysis if the same
+        waveform has been analyzed with the same configuration
+        Default set to None
 
     """
 
     def __init__(self, analyzer='world', fs=16000, fftl=1024, shiftms=5,
-                 minf0=50, maxf0=500):
+                 minf0=50, maxf0=500, cache=None):
         self.analyzer = analyzer
         self.fs = fs
         self.fftl = fftl
         self.shiftms = shiftms
         self.minf0 = minf0
         self.maxf0 = maxf0
+        self.cache = cache
+        self._config = (analyzer, fs, fftl, shiftms, minf0, maxf0)
 
         # analyzer setting
         if self.analyzer == 'world':
@@ -63,14 +104,25 @@ class FeatureExtractor(object):
         self._f0 = None
         self._spc = None
         self._ap = None
+        self._digest = None
 
-    def analyze(self, x):
+    def analyze(self, x, workers=1, segmentsec=60.0):
         """Analyze acoustic features using analyzer
 
         Parameters
         ----------
         x : array
             Array of waveform samples
+        workers : int, optional
+            The number of threads analyzing a long waveform, which is split
+            into segments of about `segmentsec` by `WORLD.analyze_parallel`.
+            The features differ from those of a single worker only around
+            the split points, and they are cached separately.
+            F0-only analysis is not split.
+            Default set to 1
+        segmentsec : float, optional
+            Approximate length of a segment analyzed by a worker [sec]
+            Default set to 60.0
 
         Returns
         -------
@@ -82,14 +134,9 @@ class FeatureExtractor(object):
             aperiodicity sequence
         """
 
-        self.x = np.array(x, dtype=np.float)
-        self._f0, self._spc, self._ap = self.analyzer.analyze(self.x)
-
-        # check non-negative for F0
-        self._f0[self._f0 < 0] = 0
-
-        if np.sum(self._f0) == 0.0:
-            print("WARNING: F0 values are all zero.")
+        self.x = np.array(x, dtype=np.float64)
+        self._f0, self._spc, self._ap, self._digest = self._analyze(
+            self.x, workers=workers, segmentsec=segmentsec)
 
         return self._f0, self._spc, self._ap
 
@@ -107,16 +154,136 @@ class FeatureExtractor(object):
             F0 sequence
         """
 
-        self.x = np.array(x, dtype=np.float)
-        self._f0 = self.analyzer.analyze_f0(self.x)
+        self.x = np.array(x, dtype=np.float64)
+        self._f0, _, _, self._digest = self._analyze(self.x, f0_only=True)
 
-        # check non-negative for F0
-        self._f0[self._f0 < 0] = 0
+        return self._f0
 
-        if np.sum(self._f0) == 0.0:
-            print("WARNING: F0 values are all zero.")
+    def extract(self, x, features=('f0', 'mcep', 'npow', 'codeap'), dim=24,
+                alpha=0.42, workers=1, segmentsec=60.0):
+        """Extract acoustic features without keeping the waveform
 
-        return self._f0
+        Unlike `analyze`, this method does not change the state of the
+        instance, so that the instance can be shared across threads.
+
+        Parameters
+        ----------
+        x : array
+            Array of waveform samples
+        features : list, optional
+            Names of features to be extracted, which are selected from
+            'f0', 'spc', 'ap', 'mcep', 'npow', and 'codeap'.
+            Only F0 is analyzed if `features` consists of 'f0'.
+            Default set to ('f0', 'mcep', 'npow', 'codeap')
+        dim : int, optional
+            Dimension of the mel-cepstrum sequence
+            Default set to 24
+        alpha : float, optional
+            Parameter of all-path fileter for frequency transformation
+            Default set to 0.42
+        workers : int, optional
+            The number of threads analyzing a long waveform, which is split
+            into segments of about `segmentsec` by `WORLD.analyze_parallel`.
+            The features differ from those of a single worker only around
+            the split points, and they are cached separately.
+            F0-only analysis is not split.
+            Default set to 1
+        segmentsec : float, optional
+            Approximate length of a segment analyzed by a worker [sec]
+            Default set to 60.0
+
+        Returns
+        -------
+        feats : AcousticFeatures
+            Immutable bundle of the extracted features
+
+        """
+        unknown = set(features) - set(FEATURES)
+        if len(unknown) > 0:
+            raise ValueError(
+                'Unsupported features: {}'.format(', '.join(sorted(unknown))))
+
+        x = np.array(x, dtype=np.float64)
+        f0, spc, ap, digest = self._analyze(
+            x, f0_only=set(features) <= {'f0'}, workers=workers,
+            segmentsec=segmentsec)
+
+        feats = {'f0': f0, 'spc': spc, 'ap': ap}
+        if 'mcep' in features:
+            feats['mcep'] = self._mcep(spc, dim, alpha, digest)
+        if 'npow' in features:
+            feats['npow'] = spc2npow(spc)
+        if 'codeap' in features:
+            feats['codeap'] = pyworld.code_aperiodicity(ap, self.fs)
+        return AcousticFeatures(*[feats[name] if name in features else None
+                                  for name in FEATURES])
+
+    def analyze_many(self, xs, features=('f0', 'mcep', 'npow', 'codeap'),
+                     dim=24, alpha=0.42, workers=1, backend='thread'):
+        """Extract acoustic features of several waveforms in parallel
+
+        The results are yielded in order of completion with the index of
+        the waveform. At most `2 * workers` waveforms are analyzed or
+        waiting at once, so that `xs` can be a generator reading files.
+
+        Parameters
+        ----------
+        xs : iterable
+            Iterable of arrays of waveform samples
+        features : list, optional
+            Names of features to be extracted
+            Default set to ('f0', 'mcep', 'npow', 'codeap')
+        dim : int, optional
+            Dimension of the mel-cepstrum sequence
+            Default set to 24
+        alpha : float, optional
+            Parameter of all-path fileter for frequency transformation
+            Default set to 0.42
+        workers : int, optional
+            The number of workers
+            Default set to 1
+        backend : str, optional
+            Type of workers
+            'thread' : threads sharing this instance, which run in parallel
+                       while the analyzer releases the GIL
+            'process' : processes
+            Default set to 'thread'
+
+        Yields
+        ------
+        index : int
+            Index of the waveform in `xs`
+        feats : AcousticFeatures
+            Immutable bundle of the extracted features
+
+        """
+        if backend == 'thread':
+            executor_class = ThreadPoolExecutor
+        elif backend == 'process':
+            executor_class = ProcessPoolExecutor
+        else:
+            raise ValueError('backend should be thread or process')
+
+        if workers == 1:
+            for index, x in enumerate(xs):
+                yield index, self.extract(x, features=features, dim=dim,
+                                          alpha=alpha)
+            return
+
+        with executor_class(max_workers=workers) as executor:
+            pending = {}
+            for index, x in enumerate(xs):
+                future = executor.submit(self.extract, x, features=features,
+                                         dim=dim, alpha=alpha)
+                pending[future] = index
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield pending.pop(future), future.result()
+            while len(pending) > 0:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
 
     def mcep(self, dim=24, alpha=0.42):
         """Return mel-cepstrum sequence parameterized from spectral envelope
@@ -136,7 +303,7 @@ class FeatureExtractor(object):
         """
         self._analyzed_check()
 
-        return pysptk.sp2mc(self._spc, dim, alpha)
+        return self._mcep(self._spc, dim, alpha, self._digest)
 
     def codeap(self):
         """Return coded aperiodicity sequence
@@ -169,6 +336,90 @@ class FeatureExtractor(object):
 
         return spc2npow(self._spc)
 
+    def _analyze(self, x, f0_only=False, workers=1, segmentsec=60.0):
+        """Analyze F0, spc, and ap, or read them from the cache
+
+        Parameters
+        ----------
+        x : array
+            Array of waveform samples
+        f0_only : bool, optional
+            Analyze only F0, where `spc` and `ap` are `None`
+            Default set to False
+        workers : int, optional
+            The number of threads analyzing the split waveform
+            Default set to 1
+        segmentsec : float, optional
+            Approximate length of a segment analyzed by a worker [sec]
+            Default set to 60.0
+
+        Returns
+        -------
+        f0 : array, shape (`T`,)
+            F0 sequence
+        spc : array, shape (`T`, `fftl / 2 + 1`)
+            Spectral envelope sequence
+        ap: array, shape (`T`, `fftl / 2 + 1`)
+            aperiodicity sequence
+        digest : str
+            Digest of the waveform, which is `None` without cache.
+            The digest of split analysis includes `segmentsec`.
+
+        """
+        names = ['f0'] if f0_only else ['f0', 'spc', 'ap']
+        if self.cache is None:
+            digest = None
+        else:
+            digest = self.cache.digest(x)
+            if workers > 1 and not f0_only:
+                # features of split analysis differ around the split points,
+                # so that they and the mel-cepstrum parameterized from them
+                # are cached apart from those of analysis at once
+                digest = '{}_split_{}'.format(digest, segmentsec)
+            feats = [self._load_cache(digest, name) for name in names]
+            if all(feat is not None for feat in feats):
+                return tuple(feats + [None] * (3 - len(feats))) + (digest,)
+
+        if f0_only:
+            feats = [self.analyzer.analyze_f0(x)]
+        elif workers > 1:
+            feats = list(self.analyzer.analyze_parallel(
+                x, workers=workers, segmentsec=segmentsec))
+        else:
+            feats = list(self.analyzer.analyze(x))
+        self._check_f0(feats[0])
+
+        if self.cache is not None:
+            for name, feat in zip(names, feats):
+                self._save_cache(digest, name, feat)
+        return tuple(feats + [None] * (3 - len(feats))) + (digest,)
+
+    def _mcep(self, spc, dim, alpha, digest=None):
+        # mel-cepstrum is cached for each dim and alpha
+        name = 'mcep_{}_{}'.format(dim, alpha)
+        if self.cache is not None and digest is not None:
+            mcep = self._load_cache(digest, name)
+            if mcep is not None:
+                return mcep
+
+        mcep = pysptk.sp2mc(spc, dim, alpha)
+        if self.cache is not None and digest is not None:
+            self._save_cache(digest, name, mcep)
+        return mcep
+
+    def _load_cache(self, digest, name):
+        return self.cache.load(self.cache.key(digest, self._config, name))
+
+    def _save_cache(self, digest, name, feat):
+        self.cache.save(self.cache.key(digest, self._config, name), feat)
+
+    def _check_f0(self, f0):
+        # check non-negative for F0
+        f0[f0 < 0] = 0
+
+        if np.sum(f0) == 0.0:
+            print("WARNING: F0 values are all zero.")
+
     def _analyzed_check(self):
         if self._f0 is None and self._spc is None and self._ap is None:
             raise('Call FeatureExtractor.analyze() before get parameterized features.')
@@ -7,6 +7,7 @@ import numpy as np
 from scipy.io import wavfile
 import pyworld
 from sprocket.speech import FeatureExtractor, Synthesizer
+from sprocket.speech.analyzer import WORLD
 
 dirpath = os.path.dirname(os.path.realpath(__file__))
 minf0 = 60
@@ -69,6 +70,67 @@ class AnalysisSynthesisTest(unittest.TestCase):
         wav = synth.synthesis_spc(f0, spc, ap)
         nun_check(wav)
 
+    def test_extract_and_analyze_many(self):
+        path = dirpath + '/data/test16000.wav'
+        fs, x = wavfile.read(path)
+        af = FeatureExtractor(analyzer='world', fs=fs, shiftms=5)
+        f0, spc, ap = af.analyze(x)
+        mcep = af.mcep(dim=24, alpha=0.42)
+
+        # stateless extraction gives same features as analyze
+        feats = af.extract(x, dim=24, alpha=0.42)
+        assert np.array_equal(feats.f0, f0)
+        assert np.array_equal(feats.mcep, mcep)
+        assert np.array_equal(feats.npow, af.npow())
+        assert feats.spc is None and feats.ap is None
+        with self.assertRaises(AttributeError):
+            feats.f0 = f0
+        assert af.extract(x, features=['f0']).mcep is None
+
+        xs = [x, x[:len(x) // 2], x[len(x) // 2:]]
+        for backend in ['thread', 'process']:
+            results = dict(af.analyze_many(iter(xs), features=['f0', 'npow'],
+                                           workers=2, backend=backend))
+            assert sorted(results.keys()) == [0, 1, 2]
+            assert np.array_equal(results[0].npow, feats.npow)
+
+        with self.assertRaises(ValueError):
+            af.extract(x, features=['mfcc'])
+        with self.assertRaises(ValueError):
+            list(af.analyze_many(xs, backend='gpu'))
+
+    def test_analyze_parallel(self):
+        path = dirpath + '/data/test16000.wav'
+        fs, x = wavfile.read(path)
+        x = np.tile(np.array(x, dtype=np.float64), 3)
+        world = WORLD(fs=fs, fftl=1024, shiftms=5)
+        f0, spc, ap = world.analyze(x)
+
+        pf0, pspc, pap = world.analyze_parallel(x, workers=2, segmentsec=2.0,
+                                                marginsec=0.5)
+        assert pf0.shape == f0.shape
+        assert pspc.shape == spc.shape
+        assert pap.shape == ap.shape
+        same = ((np.abs(pf0 - f0) < 1.0) &
+                (np.max(np.abs(np.log(pspc) - np.log(spc)), axis=1) < 0.05) &
+                (np.max(np.abs(pap - ap), axis=1) < 0.05))
+        assert np.mean(same) > 0.95
+
+        # short waveform is analyzed at once
+        sf0, _, _ = world.analyze_parallel(x[:fs], segmentsec=2.0)
+        assert np.array_equal(sf0, world.analyze(x[:fs])[0])
+
+        # parallel analysis through FeatureExtractor
+        af = FeatureExtractor(analyzer='world', fs=fs, shiftms=5)
+        af0, aspc, _ = af.analyze(x, workers=2, segmentsec=2.0)
+        pf0, pspc, _ = af.analyzer.analyze_parallel(x, workers=2,
+                                                    segmentsec=2.0)
+        assert np.array_equal(af0, pf0)
+        assert np.array_equal(aspc, pspc)
+        feats = af.extract(x, features=['f0', 'mcep'], workers=2,
+                           segmentsec=2.0)
+        assert np.array_equal(feats.f0, af0)
+
 
 def nun_check(wav):
     if any(np.isnan(wav)):
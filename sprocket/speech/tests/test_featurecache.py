@@ -0,0 +1,138 @@
+from __future__ import division, print_function, absolute_import
+
+import unittest
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+from scipy.io import wavfile
+from sprocket.speech import FeatureCache, FeatureExtractor
+
+dirpath = os.path.dirname(os.path.realpath(__file__))
+
+
+class FeatureCacheTest(unittest.TestCase):
+
+    def test_feature_extractor_cache(self):
+        path = dirpath + '/data/test16000.wav'
+        with tempfile.TemporaryDirectory() as cache_dir:
+            self._test_feature_extractor_cache(path, cache_dir)
+
+    def _test_feature_extractor_cache(self, path, cache_dir):
+        fs, x = wavfile.read(path)
+        x = x[:fs]
+        cache = FeatureCache(cache_dir)
+
+        af = FeatureExtractor(analyzer='world', fs=fs, shiftms=5)
+        f0, spc, ap = af.analyze(x)
+        mcep = af.mcep(dim=24, alpha=0.42)
+
+        # features are read from the cache for the same waveform
+        caf = FeatureExtractor(analyzer='world', fs=fs, shiftms=5,
+                               cache=cache)
+        caf.analyze(x)
+        caf.mcep(dim=24, alpha=0.42)
+        n_files = len(os.listdir(cache_dir))
+        assert n_files == 4
+        cf0, cspc, cap = caf.analyze(x)
+        assert np.array_equal(cf0, f0)
+        assert np.array_equal(cspc, spc)
+        assert np.array_equal(caf.mcep(dim=24, alpha=0.42), mcep)
+        assert np.array_equal(caf.analyze_f0(x), f0)
+        feats = caf.extract(x, features=['f0', 'ap', 'mcep'])
+        assert np.array_equal(feats.ap, ap)
+        assert len(os.listdir(cache_dir)) == n_files
+
+        # different configuration is not read from the cache
+        caf = FeatureExtractor(analyzer='world', fs=fs, shiftms=5, minf0=60,
+                               cache=cache)
+        caf.analyze_f0(x)
+        assert len(os.listdir(cache_dir)) == n_files + 1
+
+        # least recently used files are evicted
+        f0key = cache.key(cache.digest(x), caf._config, 'f0')
+        past = time.time() - 10
+        for fname in os.listdir(cache_dir):
+            os.utime(os.path.join(cache_dir, fname), (past, past))
+        assert cache.load(f0key) is not None
+        cache.max_bytes = cache.size() - 1
+        dummykey = cache.key(cache.digest(x), caf._config, 'dummy')
+        cache.save(dummykey, np.zeros(1))
+        assert cache.size() <= cache.max_bytes
+        assert len(os.listdir(cache_dir)) < n_files + 2
+        assert cache.load(f0key) is not None
+        assert cache.load(dummykey) is not None
+
+    def test_cache_size(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FeatureCache(cache_dir)
+            cache.save('a', np.zeros(100))
+            size = cache.size()
+            assert cache._size == size
+
+            # size is tracked without scanning the directory
+            cache._entries = None
+            cache.save('b', np.zeros(100))
+            assert cache._size == 2 * size
+
+            # orphan temporary files are counted and removed when stale
+            cache = FeatureCache(cache_dir, tmp_age=60)
+            tmppath = os.path.join(cache_dir, 'c.h5.0.0.tmp')
+            with open(tmppath, 'wb') as fp:
+                fp.write(b'0' * 10)
+            assert cache.size() == 2 * size + 10
+            past = time.time() - 120
+            os.utime(tmppath, (past, past))
+            assert cache.size() == 2 * size
+            assert not os.path.exists(tmppath)
+
+    def test_cache_in_processes(self):
+        path = dirpath + '/data/test16000.wav'
+        fs, x = wavfile.read(path)
+        xs = [x[:fs // 2], x[fs // 2:fs]]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FeatureCache(cache_dir)
+            cache.save('a', np.zeros(100))
+            pcache = pickle.loads(pickle.dumps(cache))
+            assert pcache._size is None
+            pcache.save('b', np.zeros(100))
+            assert pcache._size == cache.size()
+
+            # features are cached by the worker processes
+            af = FeatureExtractor(analyzer='world', fs=fs, shiftms=5,
+                                  cache=cache)
+            results = dict(af.analyze_many(xs, features=['f0'], workers=2,
+                                           backend='process'))
+            for i, px in enumerate(xs):
+                key = cache.key(cache.digest(px), af._config, 'f0')
+                assert np.array_equal(cache.load(key), results[i].f0)
+
+    def test_cache_split_analysis(self):
+        path = dirpath + '/data/test16000.wav'
+        fs, x = wavfile.read(path)
+        x = np.tile(np.array(x, dtype=np.float64), 3)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FeatureCache(cache_dir)
+            af = FeatureExtractor(analyzer='world', fs=fs, shiftms=5)
+            f0, spc, _ = af.analyze(x)
+            mcep = af.mcep(dim=24, alpha=0.42)
+            pf0, pspc, _ = af.analyze(x, workers=2, segmentsec=2.0)
+            pmcep = af.mcep(dim=24, alpha=0.42)
+            assert not np.array_equal(pspc, spc)
+
+            # split analysis and analysis at once are not mixed in cache
+            caf = FeatureExtractor(analyzer='world', fs=fs, shiftms=5,
+                                   cache=cache)
+            caf.extract(x, features=['mcep'], workers=2, segmentsec=2.0)
+            feats = caf.extract(x, features=['f0', 'spc', 'mcep'])
+            assert np.array_equal(feats.spc, spc)
+            assert np.array_equal(feats.mcep, mcep)
+            feats = caf.extract(x, features=['f0', 'spc', 'mcep'],
+                                workers=2, segmentsec=2.0)
+            assert np.array_equal(feats.spc, pspc)
+            assert np.array_equal(feats.mcep, pmcep)
+            n_files = len(os.listdir(cache_dir))
+            caf.extract(x, features=['mcep'], workers=2, segmentsec=4.0)
+            assert len(os.listdir(cache_dir)) > n_files
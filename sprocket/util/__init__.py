@@ -2,5 +2,7 @@ from .delta import delta, static_delta, construct_static_and_delta_matrix
 from .distance import melcd
 from .extfrm import extfrm
 from .hdf5 import HDF5
+from .mlpg import mlpg, mlpg_cg, StreamingMLPG
+from .coreset import construct_coreset
 from .twf import estimate_twf, align_data
 from .filter import low_pass_filter, high_pass_filter
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+
+def construct_coreset(data, n_samples, n_clusters=32, random_state=None):
+    """Construct weighted coreset by sensitivity sampling
+
+    Frames are sampled with probability proportional to their sensitivity,
+    which is bounded by the distance to the nearest center of k-means++
+    seeding and the size of its cluster. Weights of sampled frames are
+    inverse of the expected number of samples, so that weighted statistics
+    of the coreset approximate those of the data. A frame sampled several
+    times appears once with the summed weight.
+
+    Parameters
+    ----------
+    data : array, shape (`T`, `dim`)
+        Array of input data
+    n_samples : int
+        The number of frames sampled for the coreset
+    n_clusters : int, optional
+        The number of centers for k-means++ seeding
+        Default set to 32
+    random_state : int, optional
+        Seed of random number generator
+        Default set to `None`
+
+    Returns
+    -------
+    coreset : array, shape (`T_coreset`, `dim`)
+        Sampled frames, where `T_coreset` <= `n_samples`
+    weights : array, shape (`T_coreset`)
+        Weights of the sampled frames, whose sum is approximately `T`
+
+    """
+    if random_state is None:
+        random_state = np.random.mtrand._rand
+    else:
+        random_state = np.random.RandomState(random_state)
+
+    T = len(data)
+    n_clusters = min(n_clusters, T)
+
+    # k-means++ seeding
+    sqnorm = np.sum(data ** 2, axis=1)
+    labels = np.zeros(T, dtype=int)
+    idx = random_state.randint(T)
+    dist = np.maximum(sqnorm - 2 * np.dot(data, data[idx]) + sqnorm[idx], 0)
+    for k in range(1, n_clusters):
+        if np.sum(dist) == 0:
+            break
+        idx = random_state.choice(T, p=dist / np.sum(dist))
+        newdist = np.maximum(
+            sqnorm - 2 * np.dot(data, data[idx]) + sqnorm[idx], 0)
+        update = newdist < dist
+        dist[update] = newdist[update]
+        labels[update] = k
+
+    # sensitivity of each frame
+    alpha = 16 * (np.log(n_clusters) + 2)
+    counts = np.bincount(labels)
+    avg_dist = max(np.mean(dist), np.finfo(dist.dtype).tiny)
+    cluster_dist = np.bincount(labels, weights=dist) / np.maximum(counts, 1)
+    sensitivity = (alpha * dist / avg_dist +
+                   2 * alpha * cluster_dist[labels] / avg_dist +
+                   4 * T / counts[labels])
+    prob = sensitivity / np.sum(sensitivity)
+
+    # importance sampling, where weights of duplicated frames are summed
+    sidx, nsample = np.unique(
+        random_state.choice(T, size=n_samples, p=prob), return_counts=True)
+    weights = nsample / (n_samples * prob[sidx])
+
+    return data[sidx], weights
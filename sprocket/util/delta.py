@@ -19,6 +19,7 @@ def delta(data, win=[-1.0, 1.0, 0]):
     -------
     delta : array, shape (`T`, `dim`)
         Array delta matrix sequence.
+        The dtype is float32 if `data` is float32, otherwise float64.
 
     """
 
@@ -30,8 +31,9 @@ def delta(data, win=[-1.0, 1.0, 0]):
     else:
         T, dim = data.shape
 
-    win = np.array(win, dtype=np.float64)
-    delta = np.zeros((T, dim))
+    dtype = np.float32 if data.dtype == np.float32 else np.float64
+    win = np.array(win, dtype=dtype)
+    delta = np.zeros((T, dim), dtype=dtype)
 
     delta[0] = win[0] * data[0] + win[1] * data[1]
     delta[-1] = win[0] * data[-2] + win[1] * data[-1]
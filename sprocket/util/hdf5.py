@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
 import os
+
 import h5py
+import numpy as np
 
 
 class HDF5(object):
@@ -59,13 +61,18 @@ class HDF5(object):
         # open hdf5 file to fpath
         self.h5 = h5py.File(self.fpath, self.mode)
 
-    def read(self, ext=None):
+    def read(self, ext=None, mmap=False):
         """Read vector or array from h5 file
 
         Parameters
         ---------
         ext : str
             File extention including h5 file
+        mmap : bool, optional
+            Return read-only memory-mapped array instead of loading the data
+            if the data is stored as contiguous and uncompressed array.
+            The memory-mapped array can be shared among processes.
+            Default set to False
 
         Returns
         -------
@@ -76,9 +83,16 @@ class HDF5(object):
         if ext is None:
             raise ValueError("Please specify an existing extention.")
 
-        return self.h5[ext][()]
+        dataset = self.h5[ext]
+        if mmap and dataset.shape and dataset.dtype.kind in "biuf":
+            offset = dataset.id.get_offset()
+            if offset is not None:
+                return np.memmap(self.fpath, dtype=dataset.dtype, mode='r',
+                                 offset=offset, shape=dataset.shape)
+
+        return dataset[()]
 
-    def save(self, data, ext=None):
+    def save(self, data, ext=None, dtype=None):
         """Write vector or array into h5 file
 
         Parameters
@@ -89,8 +103,17 @@ class HDF5(object):
         ext: str
             File label of saved file
 
+        dtype : data-type, optional
+            Data type of the saved array, e.g., `np.float32` to halve
+            the size of the features
+            `None` : data type of `data`
+            Default set to None
+
         """
 
+        if dtype is not None:
+            data = np.asarray(data, dtype=dtype)
+
         # remove if 'ext' already exist
         if ext in self.h5.keys():
             del self.h5[ext]
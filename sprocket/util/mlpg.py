@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import scipy.linalg
+
+
+def mlpg(mseq, cseq, precisions, win=[-1.0, 1.0, 0], chunksize=1024):
+    """Maximum likelihood parameter generation based on banded Cholesky solver
+
+    Solve y = (W'DW)^-1 W'Dm without constructing W and D as sparse
+    matrices. Since W'DW is symmetric positive-definite and banded, its
+    banded form is directly accumulated from the mixture sequence and
+    the precision matrices, and it is solved by banded Cholesky
+    decomposition in linear time for `T`. If the precision matrices are
+    diagonal, MLPG is performed in each dimension independently.
+    The computation is performed in float32 if both `mseq` and
+    `precisions` are float32.
+
+    Parameters
+    ----------
+    mseq : array, shape (`T`, `dim * 2`)
+        Mean vector sequence of static and delta components
+    cseq : array, shape (`T`)
+        Index sequence of the precision matrices
+    precisions : array, shape (`n_mix`, `dim * 2`, `dim * 2`)
+        Precision matrices of static and delta components
+        Diagonal precision matrices are given as shape (`n_mix`, `dim * 2`)
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+    chunksize : int, optional
+        The number of frames processed at once while constructing the
+        banded matrix.
+        Default set to 1024.
+
+    Returns
+    -------
+    odata : array, shape (`T`, `dim`)
+        Generated static feature sequence
+
+    """
+
+    T, sddim = mseq.shape
+    D = sddim // 2
+
+    if precisions.ndim == 2:
+        return _mlpg_diagonal(mseq, cseq, precisions, win=win)
+
+    # construct W'DW as banded form and W'Dm
+    ab = construct_banded_precision_matrix(cseq, precisions, win=win,
+                                           chunksize=chunksize)
+    WDm = apply_transposed_window(
+        precision_weighted_mean(mseq, cseq, precisions), win=win)
+
+    # estimate y = (W'DW)^-1 * W'Dm
+    odata = scipy.linalg.solveh_banded(ab, WDm.ravel(), lower=True)
+    return odata.reshape(T, D)
+
+
+def mlpg_cg(mseq, cseq, precisions, win=[-1.0, 1.0, 0], tol=1e-8,
+            maxiter=None):
+    """Maximum likelihood parameter generation based on conjugate gradient
+
+    Solve (W'DW) y = W'Dm by preconditioned conjugate gradient method,
+    where the product of W'DW and y is computed from the mixture sequence
+    and the precision matrices without constructing W'DW. The memory
+    usage is proportional to `T * dim` while the solution is iterative.
+
+    Parameters
+    ----------
+    mseq : array, shape (`T`, `dim * 2`)
+        Mean vector sequence of static and delta components
+    cseq : array, shape (`T`)
+        Index sequence of the precision matrices
+    precisions : array, shape (`n_mix`, `dim * 2`, `dim * 2`)
+        Precision matrices of static and delta components
+        Diagonal precision matrices are given as shape (`n_mix`, `dim * 2`)
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+    tol : float, optional
+        Tolerance of relative residual norm
+        Default set to 1e-8.
+    maxiter : int, optional
+        Maximum number of iterations
+        Default set to `None` (i.e., `T * dim`)
+
+    Returns
+    -------
+    odata : array, shape (`T`, `dim`)
+        Generated static feature sequence
+
+    """
+
+    T, sddim = mseq.shape
+    D = sddim // 2
+    maxiter = T * D if maxiter is None else maxiter
+
+    # tolerance is bounded by the machine precision, e.g., for float32
+    tol = max(tol, 100 * np.finfo(_float_dtype(mseq, precisions)).eps)
+
+    def WDW(y):
+        return apply_transposed_window(
+            precision_weighted_mean(apply_window(y, win=win), cseq, precisions),
+            win=win)
+
+    # Jacobi preconditioner, i.e., diagonal elements of W'DW
+    coef = _window_coefficients(win, dtype=_float_dtype(precisions))
+    if precisions.ndim == 2:
+        diagP = precisions.reshape(-1, 2, D)
+    else:
+        diagP = np.diagonal(precisions, axis1=1, axis2=2).reshape(-1, 2, D)
+    crossP = 0.0 if precisions.ndim == 2 else np.einsum(
+        "mii->mi", precisions[:, :D, D:])
+    diagWDW = np.zeros((T, D), dtype=_float_dtype(precisions))
+    for a in range(len(coef)):
+        s, w = coef[a]
+        g = (s * s * diagP[:, 0] + w * w * diagP[:, 1] + 2 * s * w * crossP)
+        o = a - 1
+        diagWDW[max(0, o):T + min(0, o)] += g[cseq[max(0, -o):T - max(0, o)]]
+
+    # preconditioned conjugate gradient from static mean sequence
+    b = apply_transposed_window(
+        precision_weighted_mean(mseq, cseq, precisions), win=win)
+    y = mseq[:, :D].copy()
+    r = b - WDW(y)
+    z = r / diagWDW
+    p = z.copy()
+    rz = np.sum(r * z)
+    bnorm = np.linalg.norm(b)
+    for _ in range(maxiter):
+        if np.linalg.norm(r) <= tol * bnorm:
+            break
+        Ap = WDW(p)
+        alpha = rz / np.sum(p * Ap)
+        y += alpha * p
+        r -= alpha * Ap
+        z = r / diagWDW
+        rz, rz_prev = np.sum(r * z), rz
+        p = z + (rz / rz_prev) * p
+
+    return y
+
+
+def construct_banded_precision_matrix(cseq, precisions, win=[-1.0, 1.0, 0],
+                                      chunksize=1024):
+    """Construct W'DW as lower banded form
+
+    Parameters
+    ----------
+    cseq : array, shape (`T`)
+        Index sequence of the precision matrices
+    precisions : array, shape (`n_mix`, `dim * 2`, `dim * 2`)
+        Precision matrices of static and delta components
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+    chunksize : int, optional
+        The number of frames processed at once.
+        Default set to 1024.
+
+    Returns
+    -------
+    ab : array, shape (`bandwidth + 1`, `T * dim`)
+        Lower banded form of W'DW used in `scipy.linalg.solveh_banded`
+
+    """
+
+    T = len(cseq)
+    n_mix, sddim, _ = precisions.shape
+    D = sddim // 2
+    dtype = _float_dtype(precisions)
+    coef = _window_coefficients(win, dtype=dtype)
+
+    # local contribution of each mixture, G[m, a, b] = S_a' P_m S_b,
+    # where S_a = [s_a * I; w_a * I] is applied to frame t - 1 + a
+    G = np.einsum("ap,mpiqj,bq->mabij", coef,
+                  precisions.reshape(n_mix, 2, D, 2, D), coef)
+
+    # block bandwidth of W'DW
+    active = np.nonzero(np.any(coef != 0, axis=1))[0]
+    K = active[-1] - active[0]
+
+    ab = np.zeros(((K + 1) * D, T * D), dtype=dtype)
+    ii, jj = np.meshgrid(np.arange(D), np.arange(D), indexing="ij")
+    for k in range(K + 1):
+        # position of (i, j) element of k-th lower block in banded form
+        drow = k * D + ii - jj
+        mask = drow >= 0
+        rows, i_idx, j_idx = drow[mask], ii[mask], jj[mask]
+
+        for b in range(len(coef) - k):
+            a = b + k
+            # frame t contributes to the block (t - 1 + a, t - 1 + b)
+            start, end = max(0, 1 - b), min(T, T + 1 - a)
+            for s in range(start, end, chunksize):
+                e = min(s + chunksize, end)
+                blocks = G[cseq[s:e], a, b]
+                cols = (np.arange(s, e) - 1 + b)[:, np.newaxis] * D + j_idx
+                ab[rows, cols] += blocks[:, i_idx, j_idx]
+
+    return ab
+
+
+def precision_weighted_mean(mseq, cseq, precisions):
+    """Multiply mean vector sequence by precision matrix sequence
+
+    Parameters
+    ----------
+    mseq : array, shape (`T`, `dim * 2`)
+        Mean vector sequence of static and delta components
+    cseq : array, shape (`T`)
+        Index sequence of the precision matrices
+    precisions : array, shape (`n_mix`, `dim * 2`, `dim * 2`)
+        Precision matrices of static and delta components
+        Diagonal precision matrices are given as shape (`n_mix`, `dim * 2`)
+
+    Returns
+    -------
+    Dm : array, shape (`T`, `dim * 2`)
+        Precision weighted mean vector sequence
+
+    """
+
+    if precisions.ndim == 2:
+        return mseq * precisions[cseq]
+
+    Dm = np.empty(mseq.shape, dtype=_float_dtype(mseq, precisions))
+    for m in np.unique(cseq):
+        idx = cseq == m
+        Dm[idx] = mseq[idx] @ precisions[m].T
+    return Dm
+
+
+def apply_window(data, win=[-1.0, 1.0, 0]):
+    """Multiply static sequence by W
+
+    Parameters
+    ----------
+    data : array, shape (`T`, `dim`)
+        Static sequence
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+
+    Returns
+    -------
+    sddata : array, shape (`T`, `dim * 2`)
+        Static and delta sequence of W * data
+
+    """
+
+    T, D = data.shape
+    dtype = _float_dtype(data)
+    coef = _window_coefficients(win, dtype=dtype)
+
+    sddata = np.zeros((T, 2, D), dtype=dtype)
+    for a in range(len(coef)):
+        # frame t refers to the frame t - 1 + a
+        o = a - 1
+        sddata[max(0, -o):T - max(0, o)] += np.einsum(
+            "p,td->tpd", coef[a], data[max(0, o):T + min(0, o)])
+    return sddata.reshape(T, 2 * D)
+
+
+def apply_transposed_window(sddata, win=[-1.0, 1.0, 0]):
+    """Multiply static and delta sequence by transposed W
+
+    Parameters
+    ----------
+    sddata : array, shape (`T`, `dim * 2`)
+        Static and delta sequence
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+
+    Returns
+    -------
+    data : array, shape (`T`, `dim`)
+        Sequence of W' * sddata
+
+    """
+
+    T, sddim = sddata.shape
+    dtype = _float_dtype(sddata)
+    coef = _window_coefficients(win, dtype=dtype)
+
+    sddata = sddata.reshape(T, 2, sddim // 2)
+    data = np.zeros((T, sddim // 2), dtype=dtype)
+    for a in range(len(coef)):
+        # frame t contributes to the frame t - 1 + a
+        o = a - 1
+        data[max(0, o):T + min(0, o)] += np.einsum(
+            "p,tpd->td", coef[a], sddata[max(0, -o):T - max(0, o)])
+    return data
+
+
+def _mlpg_diagonal(mseq, cseq, precisions, win=[-1.0, 1.0, 0]):
+    # MLPG for diagonal precision matrices, where W'DW is decomposed into
+    # banded matrices of each dimension
+    T, sddim = mseq.shape
+    D = sddim // 2
+    dtype = _float_dtype(mseq, precisions)
+    coef = _window_coefficients(win, dtype=dtype)
+    active = np.nonzero(np.any(coef != 0, axis=1))[0]
+    K = active[-1] - active[0]
+
+    # banded form of W'DW in each dimension, shape (dim, K + 1, T)
+    precseq = precisions[cseq].reshape(T, 2, D)
+    ab = np.zeros((D, K + 1, T), dtype=dtype)
+    for k in range(K + 1):
+        for b in range(len(coef) - k):
+            a = b + k
+            # frame t contributes to the element (t - 1 + a, t - 1 + b)
+            start, end = max(0, 1 - b), min(T, T + 1 - a)
+            ab[:, k, start - 1 + b:end - 1 + b] += np.einsum(
+                "p,tpd->dt", coef[a] * coef[b], precseq[start:end])
+
+    WDm = apply_transposed_window(
+        precision_weighted_mean(mseq, cseq, precisions), win=win)
+
+    odata = np.empty((T, D), dtype=dtype)
+    for d in range(D):
+        odata[:, d] = scipy.linalg.solveh_banded(ab[d], WDm[:, d], lower=True)
+    return odata
+
+
+class StreamingMLPG(object):
+    """Low-latency MLPG with bounded lookahead
+
+    This class offers the frame-incremental maximum likelihood parameter
+    generation. The static features are generated by windowed MLPG over
+    the frames which are not emitted yet, while regarding the last emitted
+    frame as given. A frame is emitted as soon as `lookahead` future frames
+    have been received, so the latency does not depend on the length of
+    the utterance. The result equals to `mlpg` if `lookahead` is longer
+    than the input, and it approaches `mlpg` as `lookahead` increases.
+
+    Parameters
+    ----------
+    precisions : array, shape (`n_mix`, `dim * 2`, `dim * 2`)
+        Precision matrices of static and delta components
+        Diagonal precision matrices are given as shape (`n_mix`, `dim * 2`)
+    lookahead : int, optional
+        The number of future frames used to generate each frame
+        Default set to 10.
+    win: array, optional, shape (`3`)
+        The shape of window matrix for delta.
+        Default set to [-1.0, 1.0, 0].
+
+    """
+
+    def __init__(self, precisions, lookahead=10, win=[-1.0, 1.0, 0]):
+        self.precisions = precisions
+        self.lookahead = lookahead
+        self.win = win
+        self.reset()
+
+    def reset(self):
+        """Discard the frames received so far"""
+        sddim = self.precisions.shape[1]
+        self._mseq = np.zeros((0, sddim), dtype=_float_dtype(self.precisions))
+        self._cseq = np.zeros(0, dtype=np.int64)
+        self._prev = None
+
+    def push(self, mseq, cseq):
+        """Receive frames and emit the generated frames which are final
+
+        Parameters
+        ----------
+        mseq : array, shape (`T`, `dim * 2`)
+            Mean vector sequence of static and delta components
+        cseq : array, shape (`T`)
+            Index sequence of the precision matrices
+
+        Returns
+        -------
+        odata : array, shape (`T_emit`, `dim`)
+            Generated static feature sequence of the emitted frames
+
+        """
+        self._mseq = np.r_[self._mseq, mseq]
+        self._cseq = np.r_[self._cseq, cseq]
+
+        n_emit = len(self._cseq) - self.lookahead
+        if n_emit <= 0:
+            return np.zeros((0, self._mseq.shape[1] // 2))
+        return self._emit(n_emit)
+
+    def flush(self):
+        """Emit all the remaining frames and reset the state
+
+        Returns
+        -------
+        odata : array, shape (`T_emit`, `dim`)
+            Generated static feature sequence of the remaining frames
+
+        """
+        odata = self._emit(len(self._cseq))
+        self.reset()
+        return odata
+
+    def _emit(self, n_emit):
+        if len(self._cseq) == 0:
+            return np.zeros((0, self._mseq.shape[1] // 2))
+
+        mseq = self._mseq.copy()
+        if self._prev is not None:
+            # move the contribution of the last emitted frame to mean
+            coef = _window_coefficients(self.win)
+            mseq[0] -= np.r_[coef[0, 0] * self._prev, coef[0, 1] * self._prev]
+
+        odata = mlpg(mseq, self._cseq, self.precisions, win=self.win)[:n_emit]
+        self._prev = odata[-1]
+        self._mseq = self._mseq[n_emit:]
+        self._cseq = self._cseq[n_emit:]
+        return odata
+
+
+def _window_coefficients(win, dtype=np.float64):
+    # coefficients of static and delta for the frames t - 1, t, and t + 1
+    static = [0, 1, 0]
+    assert len(static) == len(win)
+    return np.array([static, win], dtype=dtype).T
+
+
+def _float_dtype(*arrays):
+    # float32 if all the arrays are float32, otherwise float64
+    return np.result_type(np.float32, *arrays)
@@ -0,0 +1,29 @@
+from __future__ import division, print_function, absolute_import
+
+import unittest
+
+import numpy as np
+
+from sprocket.util import construct_coreset
+
+
+class CoresetTest(unittest.TestCase):
+
+    def test_construct_coreset(self):
+        data = np.r_[np.random.randn(9000, 4), np.random.randn(1000, 4) + 10]
+        coreset, weights = construct_coreset(data, 1000, n_clusters=8,
+                                             random_state=0)
+        assert coreset.shape[0] <= 1000
+        assert weights.shape == (len(coreset),)
+        assert np.all(weights > 0)
+        assert np.isclose(np.sum(weights), len(data), rtol=0.1)
+
+        # weighted statistics approximate those of the data
+        mean = np.average(coreset, axis=0, weights=weights)
+        assert np.allclose(mean, np.mean(data, axis=0), atol=0.3)
+
+        # reproducible with the same seed
+        coreset2, weights2 = construct_coreset(data, 1000, n_clusters=8,
+                                               random_state=0)
+        assert np.array_equal(coreset, coreset2)
+        assert np.array_equal(weights, weights2)
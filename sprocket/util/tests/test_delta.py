@@ -18,6 +18,10 @@ class DeltaFunctionsTest(unittest.TestCase):
         assert delta2d.shape[0] == data2d.shape[0]
         assert delta2d.shape[1] == data2d.shape[1]
 
+        # dtype of float32 input is kept
+        assert delta(data2d.astype(np.float32)).dtype == np.float32
+        assert delta2d.dtype == np.float64
+
     def test_construct_W_matrix(self):
         T, D = 100, 4
         W = construct_static_and_delta_matrix(T, D)
@@ -51,6 +51,38 @@ class hdf5FunctionsTest(unittest.TestCase):
         # remove files
         os.remove(path)
 
+    def test_HDF5_mmap(self):
+        data2d = np.random.rand(100).reshape(50, 2)
+        path = os.path.join(dirpath, 'data/test_mmap.h5')
+        with HDF5(path, 'w') as h5:
+            h5.save(data2d, '2d')
+            h5.save(np.array(1), 'scalar')
+
+        with HDF5(path, 'r') as h5:
+            mmap2d = h5.read(ext='2d', mmap=True)
+            scalar = h5.read(ext='scalar', mmap=True)
+        assert isinstance(mmap2d, np.memmap)
+        assert np.array_equal(mmap2d, data2d)
+        assert scalar == 1
+        del mmap2d
+
+        os.remove(path)
+
+    def test_HDF5_dtype(self):
+        data2d = np.random.rand(100).reshape(50, 2)
+        path = os.path.join(dirpath, 'data/test_dtype.h5')
+        with HDF5(path, 'w') as h5:
+            h5.save(data2d, '2d', dtype=np.float32)
+            h5.save(data2d, '2d_64')
+
+        with HDF5(path, 'r') as h5:
+            data32 = h5.read(ext='2d')
+            assert h5.read(ext='2d_64').dtype == np.float64
+        assert data32.dtype == np.float32
+        assert np.allclose(data32, data2d)
+
+        os.remove(path)
+
     def test_HDF5_current_dir(self):
         listf_current = os.path.split(listf)[-1]
         data1d = np.random.rand(50)
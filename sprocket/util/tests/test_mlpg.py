@@ -0,0 +1,91 @@
+from __future__ import division, print_function, absolute_import
+
+import unittest
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+from sprocket.util.delta import construct_static_and_delta_matrix
+from sprocket.util.mlpg import (mlpg, mlpg_cg, StreamingMLPG,
+                                construct_banded_precision_matrix)
+
+
+class MLPGFunctionsTest(unittest.TestCase):
+
+    def test_mlpg(self):
+        T, D, M = 100, 3, 4
+        win = [-0.5, 0.0, 0.5]
+        mseq = np.random.randn(T, 2 * D)
+        cseq = np.random.randint(M, size=T)
+        B = np.random.randn(M, 2 * D, 2 * D)
+        precisions = B @ B.transpose(0, 2, 1) + np.eye(2 * D)
+
+        # reference based on sparse matrices
+        W = construct_static_and_delta_matrix(T, D, win=win)
+        Dmat = scipy.sparse.block_diag(precisions[cseq], format='csr')
+        WD = W.T @ Dmat
+        ref = scipy.sparse.linalg.spsolve(WD @ W, WD @ mseq.flatten())
+
+        ab = construct_banded_precision_matrix(cseq, precisions, win=win,
+                                               chunksize=7)
+        WDW = (WD @ W).toarray()
+        for k in range(ab.shape[0]):
+            assert np.allclose(ab[k, :T * D - k], np.diag(WDW, -k))
+
+        odata = mlpg(mseq, cseq, precisions, win=win, chunksize=7)
+        assert odata.shape == (T, D)
+        assert np.allclose(odata.flatten(), ref)
+
+        # iterative solution without W'DW
+        odata = mlpg_cg(mseq, cseq, precisions, win=win, tol=1e-10)
+        assert np.allclose(odata.flatten(), ref)
+
+    def test_streaming_mlpg(self):
+        T, D, M = 200, 3, 4
+        mseq = np.random.randn(T, 2 * D)
+        cseq = np.random.randint(M, size=T)
+        B = np.random.randn(M, 2 * D, 2 * D)
+        precisions = B @ B.transpose(0, 2, 1) + np.eye(2 * D)
+        odata = mlpg(mseq, cseq, precisions)
+
+        # frame-by-frame generation converges to utterance-level MLPG
+        errors = []
+        for lookahead in [2, 10, 40]:
+            smlpg = StreamingMLPG(precisions, lookahead=lookahead)
+            sodata = [smlpg.push(mseq[t:t + 1], cseq[t:t + 1])
+                      for t in range(T)]
+            sodata = np.concatenate(sodata + [smlpg.flush()])
+            assert sodata.shape == odata.shape
+            errors.append(np.max(np.abs(sodata - odata)))
+        assert errors[0] > errors[1] > errors[2]
+        assert errors[2] < 1e-6
+
+    def test_mlpg_diagonal(self):
+        T, D, M = 100, 3, 4
+        mseq = np.random.randn(T, 2 * D)
+        cseq = np.random.randint(M, size=T)
+        precisions = np.random.rand(M, 2 * D) + 0.1
+
+        # diagonal precisions give same result as full precisions
+        full_precisions = np.array([np.diag(p) for p in precisions])
+        odata = mlpg(mseq, cseq, precisions)
+        assert np.allclose(odata, mlpg(mseq, cseq, full_precisions))
+        assert np.allclose(odata, mlpg_cg(mseq, cseq, precisions, tol=1e-10))
+
+    def test_mlpg_float32(self):
+        T, D, M = 100, 3, 4
+        mseq = np.random.randn(T, 2 * D)
+        cseq = np.random.randint(M, size=T)
+        B = np.random.randn(M, 2 * D, 2 * D)
+        precisions = B @ B.transpose(0, 2, 1) + np.eye(2 * D)
+
+        # dtype follows the inputs
+        odata = mlpg(mseq, cseq, precisions)
+        f32data = mlpg(mseq.astype(np.float32), cseq,
+                       precisions.astype(np.float32))
+        assert f32data.dtype == np.float32
+        assert np.allclose(f32data, odata, atol=1e-3)
+        cgdata = mlpg_cg(mseq.astype(np.float32), cseq,
+                         precisions.astype(np.float32), tol=1e-10)
+        assert cgdata.dtype == np.float32
+        assert np.allclose(cgdata, odata, atol=1e-3)